@@ -1,11 +1,17 @@
+import os
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
-from .database import get_db
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from .cache import TTLCache
+from .database import SessionLocal, get_db
+from .hashing import hashing_pool
 from .models import User
 
 # JWT settings
@@ -13,24 +19,81 @@ SECRET_KEY = "your-secret-key-here"  # In production, use environment variable
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost are flagged and upgraded on next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def verify_password(plain_password, hashed_password):
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+# Authenticated users are cached by JWT subject for a short time
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("USER_CACHE_TTL", 60)),
+)
 
-def get_password_hash(password):
-    """Hash a password."""
-    return pwd_context.hash(password)
+def _user_snapshot(user: User) -> dict:
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
 
-def authenticate_user(db: Session, username: str, password: str):
-    """Authenticate a user by username and password."""
-    user = db.query(User).filter(User.username == username).first()
+def _user_from_snapshot(db: Session, snapshot: dict) -> User:
+    """Attach a cached user to the session without querying the database."""
+    user = User()
+    for key, value in snapshot.items():
+        set_committed_value(user, key, value)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+def invalidate_user(username: str):
+    """Drop a user from the authentication cache."""
+    user_cache.delete(username)
+
+def _changed_usernames(session):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            yield obj.username
+            # A renamed user must also drop the entry under the old name
+            yield from inspect(obj).attrs.username.history.deleted or ()
+
+@event.listens_for(SessionLocal, "before_flush")
+def _collect_user_changes(session, flush_context, instances):
+    pending = session.info.setdefault("invalidated_usernames", set())
+    pending.update(name for name in _changed_usernames(session) if name)
+
+@event.listens_for(SessionLocal, "after_flush")
+def _invalidate_flushed_users(session, flush_context):
+    for username in session.info.get("invalidated_usernames", ()):
+        invalidate_user(username)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_changed_users(session):
+    # Also runs after commit so a concurrent request can't re-cache old data
+    for username in session.info.pop("invalidated_usernames", ()):
+        invalidate_user(username)
+
+async def hash_password_async(password):
+    """Hash a password on the hashing pool."""
+    return await hashing_pool.run(pwd_context.hash, password)
+
+async def authenticate_user_async(db: Session, username: str, password: str):
+    """
+    Authenticate a user with bcrypt running on the hashing pool.
+
+    A hash made with an outdated cost is replaced after a successful login.
+    """
+    user = await run_in_threadpool(db.query(User).filter(User.username == username).first)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await hashing_pool.run(pwd_context.verify_and_update, password, user.hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -59,7 +122,12 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
 
+    snapshot = user_cache.get(username)
+    if snapshot is not None:
+        return _user_from_snapshot(db, snapshot)
+
     user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise credentials_exception
+    user_cache.set(username, _user_snapshot(user))
     return user
@@ -0,0 +1,224 @@
+"""
+Load-test the API end to end and report latency percentiles and throughput.
+
+Seeds a scratch database at the requested scale (kept between runs, since
+the data is deterministic), starts the geodata stub server and a uvicorn
+(or, with --server gunicorn, the production gunicorn profile) server
+pointed at both, then drives each scenario with concurrent clients
+for a fixed duration. Results are printed as JSON, one entry per scenario,
+so runs on different commits can be diffed.
+
+Usage: python -m backend.benchmarks.load [--scale 1k|100k|1m] [--concurrency 16]
+           [--duration 10] [--workers 1] [--server uvicorn|gunicorn]
+           [--scenario NAME ...] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+from .seed import CENTER_LAT, CENTER_LON, SCALES, SPREAD_DEG
+from .stub_server import start_stub, stub_environment
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WORDS = ("royal", "kovai", "cafe", "sri lakshmi", "metro mart")
+
+def _near_center(rng):
+    return {
+        "lat": round(CENTER_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG), 4),
+        "lon": round(CENTER_LON + rng.uniform(-SPREAD_DEG, SPREAD_DEG), 4),
+    }
+
+# name -> function(rng, businesses) returning (path, query params)
+SCENARIOS = {
+    "businesses_list": lambda rng, n: ("/businesses/", {"limit": 20, "skip": rng.randrange(0, 200)}),
+    "businesses_keyset": lambda rng, n: ("/businesses/", {"limit": 20, "cursor": ""}),
+    "businesses_category": lambda rng, n: ("/businesses/", {"category": "cafe", "limit": 20}),
+    "businesses_by_rating": lambda rng, n: ("/businesses/", {"sort_by": "rating", "limit": 20}),
+    "businesses_search": lambda rng, n: ("/businesses/", {"search": rng.choice(WORDS), "limit": 20}),
+    "business_detail": lambda rng, n: (f"/businesses/{rng.randint(1, n)}", {}),
+    "events_upcoming": lambda rng, n: ("/events/", {"limit": 20}),
+    "events_keyset": lambda rng, n: ("/events/", {"limit": 20, "cursor": ""}),
+    "events_this_week": lambda rng, n: ("/events/", {"mode": "week", "limit": 20}),
+    "events_calendar": lambda rng, n: ("/events/calendar", {"view": "week"}),
+    "nearby_businesses": lambda rng, n: ("/businesses/nearby-businesses", {**_near_center(rng), "radius": 2000}),
+    "institutions": lambda rng, n: ("/businesses/institutions", {}),
+    "real_data": lambda rng, n: ("/businesses/real-data", {}),
+}
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def ensure_database(path: str, businesses: int):
+    if os.path.exists(path):
+        return
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}"}
+    subprocess.run(
+        [sys.executable, "-m", "backend.benchmarks.seed", "--businesses", str(businesses)],
+        cwd=REPO_ROOT, env=env, check=True, stdout=sys.stderr,
+    )
+
+def start_server(port: int, workers: int, env: dict, server: str = "uvicorn") -> subprocess.Popen:
+    if server == "gunicorn":
+        command = [
+            sys.executable, "-m", "gunicorn", "backend.main:app", "-c", "backend/gunicorn.conf.py",
+            "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--log-level", "warning",
+        ]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "backend.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ]
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env)
+
+async def wait_until_ready(base_url: str, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+async def run_scenario(client, name: str, businesses: int, concurrency: int, duration: float, warmup: int) -> dict:
+    make_request = SCENARIOS[name]
+    rng = random.Random(name)
+
+    for _ in range(warmup):
+        path, params = make_request(rng, businesses)
+        await client.get(path, params=params)
+
+    latencies, errors = [], 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker(seed: int):
+        nonlocal errors
+        worker_rng = random.Random(seed)
+        while time.perf_counter() < stop_at:
+            path, params = make_request(worker_rng, businesses)
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, params=params)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def run(args) -> dict:
+    businesses = args.businesses or SCALES[args.scale]
+    database = args.database or os.path.join(tempfile.gettempdir(), f"localbiz_bench_{businesses}.db")
+    ensure_database(database, businesses)
+
+    # Every run starts without snapshots from the previous one
+    snapshot_path = os.path.join(tempfile.gettempdir(), f"localbiz_bench_{businesses}_snapshots.json")
+    if os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+
+    stub = start_stub(latency_ms=args.upstream_latency_ms)
+    env = {
+        **os.environ,
+        **stub_environment(stub),
+        "DATABASE_URL": f"sqlite:///{database}",
+        # Without the bundled OSM snapshot, spatial tiles come from the stub too
+        "OSM_SNAPSHOT_PATH": "",
+        "SNAPSHOT_PATH": snapshot_path,
+    }
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(args.port, args.workers, env, args.server)
+    try:
+        await wait_until_ready(base_url)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            results = []
+            for name in args.scenario or SCENARIOS:
+                results.append(await run_scenario(
+                    client, name, businesses, args.concurrency, args.duration, args.warmup
+                ))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        stub.shutdown()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "businesses": businesses,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "workers": args.workers,
+            "server": args.server,
+            "upstream_latency_ms": args.upstream_latency_ms,
+            "async_db_reads": os.getenv("ASYNC_DB_READS", "0") == "1",
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--businesses", type=int, help="Exact number of businesses, overriding --scale")
+    parser.add_argument("--database", help="SQLite file to use; seeded first if it doesn't exist")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests per scenario before measuring")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Run only these scenarios")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Seed the database with synthetic businesses, photos, reviews and events.
+
+Rows are bulk-inserted before the app's triggers exist; the FTS index,
+rating summaries and table-version triggers are then created the way app
+startup does, so the result matches a normally populated database. Targets
+DATABASE_URL, i.e. local_business.db unless overridden.
+
+Usage: python -m backend.benchmarks.seed [--scale 1k|100k|1m] [--reset]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from ..database import SQLALCHEMY_DATABASE_URL, engine
+from ..event_calendar import ensure_event_calendar
+from ..http_cache import ensure_table_versions
+from ..models import Base
+from ..ratings import ensure_rating_summaries
+from ..search import ensure_fts_index
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+BATCH_SIZE = 10_000
+
+# Centre of Coimbatore; businesses are spread over roughly 20 x 20 km
+CENTER_LAT, CENTER_LON = 11.0168, 76.9558
+SPREAD_DEG = 0.09
+
+CATEGORIES = ("restaurant", "cafe", "supermarket", "pharmacy", "library", "gym", "hostel", "electronics")
+WORDS = ("Sri", "Annapoorna", "Kovai", "Green", "Royal", "City", "Lakshmi", "Metro", "Star", "Cafe", "Mart", "Stores")
+
+def _batches(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _insert(sql: str, rows):
+    with engine.begin() as conn:
+        for batch in _batches(rows):
+            conn.exec_driver_sql(sql, batch)
+
+def seed(businesses: int, seed_value: int = 42) -> dict:
+    """Insert a synthetic dataset sized by the number of businesses."""
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    users = max(1, businesses // 100)
+    reviews = businesses * 2
+    events = max(1, businesses // 10)
+    start = time.perf_counter()
+
+    _insert(
+        "INSERT INTO users (username, email, hashed_password, is_active, is_business_owner, created_at) "
+        "VALUES (?, ?, 'x', 1, 1, ?)",
+        ((f"user{i}", f"user{i}@example.com", now) for i in range(1, users + 1)),
+    )
+    _insert(
+        "INSERT INTO businesses (id, name, description, category, address, latitude, longitude, phone, "
+        "operating_hours, is_verified, is_featured, owner_id, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'Mo-Su 09:00-21:00', ?, ?, ?, ?)",
+        (
+            (
+                i,
+                f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+                f"{rng.choice(WORDS)} {rng.choice(CATEGORIES)} serving students near campus",
+                rng.choice(CATEGORIES),
+                f"{i} Avinashi Road, Coimbatore",
+                CENTER_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG),
+                CENTER_LON + rng.uniform(-SPREAD_DEG, SPREAD_DEG),
+                f"+91 422 {i:07d}",
+                i % 5 == 0,
+                i % 50 == 0,
+                rng.randint(1, users),
+                now,
+            )
+            for i in range(1, businesses + 1)
+        ),
+    )
+    _insert(
+        "INSERT INTO business_photos (business_id, url, is_main) VALUES (?, ?, 1)",
+        ((i, f"/photos/{i}.jpg") for i in range(1, businesses + 1)),
+    )
+    _insert(
+        "INSERT INTO reviews (business_id, user_id, rating, comment, created_at) VALUES (?, ?, ?, 'Good', ?)",
+        ((rng.randint(1, businesses), rng.randint(1, users), rng.randint(1, 5), now) for _ in range(reviews)),
+    )
+
+    def event_rows():
+        for i in range(events):
+            # From a month ago to three months ahead, so "upcoming" filters matter
+            event_start = now + timedelta(minutes=rng.randint(-30 * 24 * 60, 90 * 24 * 60))
+            yield (f"Event {i}", rng.randint(1, businesses), event_start, event_start + timedelta(hours=3), now)
+
+    _insert(
+        "INSERT INTO events (title, description, business_id, start_date, end_date, location, created_at) "
+        "VALUES (?, 'Open house', ?, ?, ?, 'Coimbatore', ?)",
+        event_rows(),
+    )
+
+    return {
+        "users": users,
+        "businesses": businesses,
+        "photos": businesses,
+        "reviews": reviews,
+        "events": events,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+def prepare_schema():
+    """Build the FTS index, rating summaries, event calendar and triggers over the seeded data."""
+    ensure_fts_index(engine)
+    ensure_rating_summaries(engine)
+    ensure_table_versions(engine)
+    ensure_event_calendar(engine)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--businesses", type=int, help="Exact number of businesses, overriding --scale")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible data")
+    parser.add_argument("--reset", action="store_true", help="Delete an existing SQLite database first")
+    args = parser.parse_args(argv)
+
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite:///"):
+        path = SQLALCHEMY_DATABASE_URL[len("sqlite:///"):]
+        if os.path.exists(path):
+            if not args.reset:
+                sys.exit(f"{path} already exists; pass --reset to replace it")
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    # Triggers are installed after the bulk load so it doesn't fire them row by row
+    Base.metadata.create_all(bind=engine)
+    stats = seed(args.businesses or SCALES[args.scale], args.seed)
+    prepare_schema()
+    print(f"Seeded {SQLALCHEMY_DATABASE_URL}: {stats}")
+
+if __name__ == "__main__":
+    main()
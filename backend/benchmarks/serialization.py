@@ -0,0 +1,139 @@
+"""
+Benchmark response serialization for the business and event listings.
+
+"before" builds dicts by hand and runs them through FastAPI's response_model
+handling for List[dict] and the stdlib-JSON response, as the routes used to.
+"after" is the routes' current path: business rows validated into the typed
+schema and encoded by schema_response, event rows encoded by
+ORJSONResponse. Rows are built in memory, so only the serialization cost is
+measured.
+
+Usage: python -m backend.benchmarks.serialization [--sizes 100 1000] [--repeat N]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from ..models import Business, BusinessPhoto, BusinessRatingSummary
+from ..routers.events import _event_list_item
+from ..schemas import BusinessListAdapter, schema_response
+
+def make_businesses(count: int):
+    return [
+        Business(
+            id=i, name=f"Business {i}", description="Coffee, snacks and study space " * 3,
+            category="cafe", address=f"{i} Avinashi Road, Coimbatore", latitude=11.0 + i * 1e-4,
+            longitude=76.95, phone="+91 422 000 0000", email=f"biz{i}@example.com",
+            website=f"https://biz{i}.example.com", price_range="$$", operating_hours="Mo-Su 08:00-22:00",
+            is_verified=bool(i % 2), is_featured=False,
+            photos=[BusinessPhoto(url=f"/photos/{i}.jpg", is_main=True)],
+            rating_summary=BusinessRatingSummary(average_rating=4.2, review_count=12),
+        )
+        for i in range(count)
+    ]
+
+def make_event_rows(count: int):
+    start = datetime(2030, 1, 1, 18, 30)
+    return [
+        SimpleNamespace(
+            id=i, title=f"Event {i}", description="Live music night", location="Coimbatore",
+            start_date=start + timedelta(days=i), end_date=start + timedelta(days=i, hours=3),
+            business_id=i, business_name=f"Business {i}",
+        )
+        for i in range(count)
+    ]
+
+# The hand-built dicts the listing routes returned before the schemas existed
+def business_dict(business: Business) -> dict:
+    return {
+        "id": business.id,
+        "name": business.name,
+        "description": business.description,
+        "category": business.category,
+        "address": business.address,
+        "latitude": business.latitude,
+        "longitude": business.longitude,
+        "phone": business.phone,
+        "email": business.email,
+        "website": business.website,
+        "price_range": business.price_range,
+        "operating_hours": business.operating_hours,
+        "is_verified": business.is_verified,
+        "is_featured": business.is_featured,
+        "rating": business.rating_summary.average_rating if business.rating_summary else None,
+        "review_count": business.rating_summary.review_count if business.rating_summary else 0,
+        "photos": [{"url": photo.url, "is_main": photo.is_main} for photo in business.photos]
+    }
+
+def event_dict(event) -> dict:
+    return {
+        "id": event.id,
+        "title": event.title,
+        "description": event.description,
+        "start_date": event.start_date,
+        "end_date": event.end_date,
+        "location": event.location,
+        "business": {"id": event.business_id, "name": event.business_name},
+    }
+
+async def before(rows, to_dict) -> bytes:
+    field = create_response_field("Response", List[dict])
+    content = await serialize_response(field=field, response_content=[to_dict(row) for row in rows])
+    return JSONResponse(content).body
+
+async def after_businesses(rows) -> bytes:
+    return schema_response(BusinessListAdapter, rows).body
+
+async def after_events(rows) -> bytes:
+    return ORJSONResponse([_event_list_item(row) for row in rows]).body
+
+async def measure(render, repeat: int) -> float:
+    """Best-of-five mean milliseconds per render."""
+    await render()  # warm up
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await render()
+        best = min(best, (time.perf_counter() - start) / repeat * 1000)
+    return best
+
+async def run(sizes, repeat: int):
+    listings = {
+        "businesses": (make_businesses, business_dict, after_businesses),
+        "events": (make_event_rows, event_dict, after_events),
+    }
+
+    results = []
+    for listing, (make_rows, to_dict, after) in listings.items():
+        for size in sizes:
+            rows = make_rows(size)
+            before_ms = await measure(lambda: before(rows, to_dict), repeat)
+            after_ms = await measure(lambda: after(rows), repeat)
+            results.append({
+                "listing": listing,
+                "rows": size,
+                "before_ms": round(before_ms, 3),
+                "after_ms": round(after_ms, 3),
+                "speedup": round(before_ms / after_ms, 2),
+            })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.sizes, args.repeat)), indent=2))
+
+if __name__ == "__main__":
+    main()
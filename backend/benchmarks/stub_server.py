@@ -0,0 +1,137 @@
+"""
+Local stand-in for the Overpass, Nominatim and Google Places APIs.
+
+Responses are generated deterministically from the request: Overpass bbox
+queries get a fixed number of named amenities inside the box, area queries
+get a set of institutions. An optional delay mimics upstream latency. Point
+the app at it with OVERPASS_URL, NOMINATIM_URL and GOOGLE_PLACES_URL.
+
+Usage: python -m backend.benchmarks.stub_server [--port 8765] [--latency-ms 50]
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .seed import CENTER_LAT, CENTER_LON, SPREAD_DEG
+
+PLACES_PER_QUERY = 200
+INSTITUTIONS = 30
+AMENITIES = ("restaurant", "cafe", "fast_food", "pharmacy", "bank", "library", "school")
+BBOX = re.compile(r"\((-?[\d.]+),(-?[\d.]+),(-?[\d.]+),(-?[\d.]+)\)")
+
+def overpass_response(query: str) -> dict:
+    rng = random.Random(query)
+    match = BBOX.search(query)
+    if match is None:
+        # Area query for institutions
+        return {"elements": [
+            {
+                "type": "node", "id": 9_000_000 + i,
+                "lat": CENTER_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG),
+                "lon": CENTER_LON + rng.uniform(-SPREAD_DEG, SPREAD_DEG),
+                "tags": {"name": f"Stub College {i}", "amenity": "college"},
+            }
+            for i in range(INSTITUTIONS)
+        ]}
+
+    south, west, north, east = map(float, match.groups())
+    return {"elements": [
+        {
+            "type": "node", "id": rng.randrange(1, 10**9),
+            "lat": rng.uniform(south, north), "lon": rng.uniform(west, east),
+            "tags": {"name": f"Stub Place {i}", "amenity": rng.choice(AMENITIES)},
+        }
+        for i in range(PLACES_PER_QUERY)
+    ]}
+
+def nominatim_response(params: dict) -> list:
+    return [
+        {"display_name": f"Stub School {i}, Coimbatore", "lat": str(CENTER_LAT + i * 0.001),
+         "lon": str(CENTER_LON), "place_id": i}
+        for i in range(10)
+    ]
+
+def google_places_response(params: dict) -> dict:
+    lat, lon = map(float, params.get("location", f"{CENTER_LAT},{CENTER_LON}").split(","))
+    rng = random.Random(params.get("location"))
+    return {"results": [
+        {
+            "place_id": f"stub_{i}", "name": f"Stub Google Place {i}", "vicinity": "Coimbatore",
+            "rating": round(rng.uniform(3, 5), 1), "types": [params.get("type", "restaurant")],
+            "geometry": {"location": {"lat": lat + rng.uniform(-0.01, 0.01), "lng": lon + rng.uniform(-0.01, 0.01)}},
+        }
+        for i in range(20)
+    ]}
+
+def make_handler(latency_ms: float = 0):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, params: dict):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            path = urlparse(self.path).path
+            if "nominatim" in path or path.endswith("/search"):
+                body = nominatim_response(params)
+            elif "place" in path:
+                body = google_places_response(params)
+            else:
+                body = overpass_response(params.get("data", ""))
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            self._reply({key: values[0] for key, values in query.items()})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode())
+            self._reply({key: values[0] for key, values in form.items()})
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+def start_stub(port: int = 0, latency_ms: float = 0) -> ThreadingHTTPServer:
+    """Serve the stub in a background thread; port 0 picks a free port."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency_ms))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def stub_environment(server: ThreadingHTTPServer) -> dict:
+    """Environment variables pointing the app at a running stub."""
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return {
+        "OVERPASS_URL": f"{base}/overpass/interpreter",
+        "NOMINATIM_URL": f"{base}/nominatim/search",
+        "GOOGLE_PLACES_URL": f"{base}/place/nearbysearch/json",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = start_stub(args.port, args.latency_ms)
+    for name, value in stub_environment(server).items():
+        print(f"{name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark the per-request cost of resolving the authenticated user.
+
+Compares get_current_user with the user cache disabled (every call queries
+the users table) against the cached path, on a scratch SQLite database.
+
+Usage: python -m backend.benchmarks.user_lookup [--users N] [--requests N]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmpdir.name, 'bench.db')}")
+
+from sqlalchemy import event  # noqa: E402
+
+from ..auth import create_access_token, get_current_user, user_cache  # noqa: E402
+from ..database import SessionLocal, engine  # noqa: E402
+from ..models import Base, User  # noqa: E402
+
+def seed(count: int):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(User, [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+            for i in range(count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+def run(tokens, requests: int, cached: bool) -> dict:
+    user_cache.clear()
+    maxsize = user_cache.maxsize
+    if not cached:
+        user_cache.maxsize = 0
+
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    hits = user_cache.hits
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        start = time.perf_counter()
+        for _ in range(requests):
+            db = SessionLocal()
+            try:
+                get_current_user(random.choice(tokens), db)
+            finally:
+                db.close()
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        user_cache.maxsize = maxsize
+    return {
+        "cached": cached,
+        "requests": requests,
+        "us_per_request": elapsed / requests * 1e6,
+        "queries_per_request": statements[0] / requests,
+        "hit_rate": (user_cache.hits - hits) / requests,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    seed(args.users)
+    tokens = [create_access_token({"sub": f"user{i}"}) for i in range(args.users)]
+    results = [run(tokens, args.requests, cached=False), run(tokens, args.requests, cached=True)]
+    results.append({
+        "saving_us_per_request": results[0]["us_per_request"] - results[1]["us_per_request"],
+    })
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+MISSING = object()
+
+# Coordinates are snapped to ~550 m cells and radii rounded up to a bucket so
+# that nearby visitors share cache entries
+GRID_DEG = 0.005
+RADIUS_BUCKETS = (500, 1000, 2000, 3000, 5000, 10000, 20000, 50000)
+
+# Seconds between sweeps of expired rows from the disk store
+DISK_PRUNE_INTERVAL = 300
+
+def snap_point(lat: float, lon: float, grid_deg: float = GRID_DEG):
+    """Snap a coordinate to the center of its grid cell."""
+    return (
+        round((math.floor(lat / grid_deg) + 0.5) * grid_deg, 6),
+        round((math.floor(lon / grid_deg) + 0.5) * grid_deg, 6),
+    )
+
+def bucket_radius(radius: float) -> int:
+    """Round a radius up to the next bucket, leaving room for snapping error."""
+    needed = radius + GRID_DEG * 111320
+    for bucket in RADIUS_BUCKETS:
+        if bucket >= needed:
+            return bucket
+    return int(math.ceil(needed))
+
+def make_key(namespace: str, **params) -> str:
+    """Build a stable cache key from a namespace and query parameters."""
+    return namespace + ":" + json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+class TTLCache:
+    """
+    Thread-safe TTL cache with LRU eviction and optional SQLite persistence.
+
+    Values must be JSON-serializable when a path is given. The disk store is
+    consulted on memory misses, so entries survive process restarts. It
+    holds the same keys as memory: evicted and expired entries are deleted
+    from it with the next write, and a periodic sweep drops expired rows.
+    Async callers should use aget, aget_stale and aset, which do the disk
+    I/O in a thread; memory lookups never wait on it.
+
+    With stale_ttl, expired entries are kept that much longer (subject to LRU
+    eviction) and remain readable through get_stale, for callers that prefer
+    old data to none when the source is unavailable.
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float = 3600, path: Optional[str] = None, stale_ttl: float = 0
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Guards the connection, so memory operations never wait on disk I/O
+        self._disk_lock = threading.Lock()
+        self._pending_deletes = set()
+        self._pruned_at = time.time()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._inherited_conns = []
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        The disk store's connection, opened on first use in each process.
+
+        SQLite connections can't be used across fork(), so a child (e.g. a
+        worker forked from a preloaded master) opens its own. The inherited
+        one is kept referenced but never touched, as closing it would use it.
+        Callers hold _disk_lock.
+        """
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        if self._conn is not None:
+            self._inherited_conns.append(self._conn)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time() - self.stale_ttl,))
+        conn.commit()
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def __len__(self):
+        return len(self._data)
+
+    def _load_from_disk(self, key: str, stale: bool = False):
+        with self._disk_lock:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] + (self.stale_ttl if stale else 0) < time.time():
+            return MISSING
+        value = json.loads(row[0])
+        with self._lock:
+            self._store(key, value, row[1])
+        return value
+
+    def _store(self, key: str, value: Any, expires_at: float):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        self._pending_deletes.discard(key)
+        while len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            self.evictions += 1
+            if self.path:
+                self._pending_deletes.add(evicted)
+
+    def _write_disk(self, key: Optional[str] = None, value: Optional[str] = None, expires_at: float = 0):
+        """Apply pending deletes, store key if given and sweep expired rows."""
+        with self._lock:
+            deletes, self._pending_deletes = self._pending_deletes, set()
+        now = time.time()
+        with self._disk_lock:
+            conn = self._connection()
+            if deletes:
+                conn.executemany("DELETE FROM cache_entries WHERE key = ?", [(k,) for k in deletes])
+            if key is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+            if now - self._pruned_at >= DISK_PRUNE_INTERVAL:
+                self._pruned_at = now
+                conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now - self.stale_ttl,))
+            conn.commit()
+
+    def _lookup(self, key: str, stale: bool = False):
+        """Return the in-memory value for key, or MISSING."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISSING
+            now = time.time()
+            if item[0] >= now:
+                self._data.move_to_end(key)
+                return item[1]
+            if item[0] + self.stale_ttl >= now:
+                return item[1] if stale else MISSING
+            del self._data[key]
+            if self.path:
+                self._pending_deletes.add(key)
+            return MISSING
+
+    def _record(self, value: Any, default: Any, stale: bool = False) -> Any:
+        with self._lock:
+            if value is MISSING:
+                if not stale:
+                    self.misses += 1
+                return default
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        if value is MISSING and self.path:
+            value = self._load_from_disk(key)
+        return self._record(value, default)
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """Like get, with a disk lookup run in a thread."""
+        value = self._lookup(key)
+        if value is MISSING and self.path:
+            value = await asyncio.to_thread(self._load_from_disk, key)
+        return self._record(value, default)
+
+    def get_stale(self, key: str, default: Any = None) -> Any:
+        """Return the value for key even if expired, as long as it is within stale_ttl."""
+        value = self._lookup(key, stale=True)
+        if value is MISSING and self.path:
+            value = self._load_from_disk(key, stale=True)
+        return self._record(value, default, stale=True)
+
+    async def aget_stale(self, key: str, default: Any = None) -> Any:
+        """Like get_stale, with a disk lookup run in a thread."""
+        value = self._lookup(key, stale=True)
+        if value is MISSING and self.path:
+            value = await asyncio.to_thread(self._load_from_disk, key, True)
+        return self._record(value, default, stale=True)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._store(key, value, expires_at)
+        if self.path:
+            self._write_disk(key, json.dumps(value), expires_at)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Like set, with the disk write run in a thread."""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._store(key, value, expires_at)
+        if self.path:
+            await asyncio.to_thread(self._write_disk, key, json.dumps(value), expires_at)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+        if self.path:
+            with self._disk_lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._pending_deletes.clear()
+        if self.path:
+            with self._disk_lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM cache_entries")
+                conn.commit()
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value for key, calling loader and caching on a miss."""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
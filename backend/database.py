@@ -1,14 +1,118 @@
-from sqlalchemy import create_engine
+import os
+from contextlib import asynccontextmanager
+from typing import Union
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./local_business.db")
+
+# Async drivers for the read routes, by the sync URL's scheme
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(url: str) -> str:
+    """The async-driver equivalent of a database URL, or ASYNC_DATABASE_URL if set."""
+    override = os.getenv("ASYNC_DATABASE_URL")
+    if override:
+        return override
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme.split("+")[0], scheme) + sep + rest
+
+# Per-connection SQLite pragmas. "tuned" enables WAL so readers don't block
+# on writers; "default" leaves SQLite's own settings untouched.
+ENGINE_PROFILES = {
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,  # negative means KiB, i.e. 64 MB
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,  # milliseconds
+    },
+    "default": {},
+}
+
+DB_PROFILE = os.getenv("DB_PROFILE", "tuned")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+# Serve the read routes through AsyncSession on the async engine. Off by
+# default: on SQLite, aiosqlite's per-call thread hops cost more throughput
+# than running each statement in the threadpool.
+ASYNC_DB_READS = os.getenv("ASYNC_DB_READS", "0") == "1"
+
+def sqlite_pragmas(profile: str = DB_PROFILE) -> dict:
+    """Pragmas for a profile, each overridable with a SQLITE_<NAME> variable."""
+    pragmas = dict(ENGINE_PROFILES[profile])
+    for name in ENGINE_PROFILES["tuned"]:
+        value = os.getenv(f"SQLITE_{name.upper()}")
+        if value is not None:
+            pragmas[name] = value
+    return pragmas
+
+def _create_engine(url: str):
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT
+        )
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./local_business.db"
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        # In-memory databases live and die with their single connection
+        return create_engine(url, connect_args={"check_same_thread": False})
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+    sqlite_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    _apply_pragmas(sqlite_engine)
+    return sqlite_engine
+
+def _apply_pragmas(sqlite_engine):
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(sqlite_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def _create_async_engine(url: str):
+    if not url.startswith("sqlite"):
+        return create_async_engine(
+            url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT
+        )
+
+    if url.endswith("://") or url.endswith(":memory:"):
+        # A separate, empty database from the sync engine's; only file URLs share data
+        return create_async_engine(url, poolclass=StaticPool)
+
+    async_sqlite_engine = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    _apply_pragmas(async_sqlite_engine.sync_engine)
+    return async_sqlite_engine
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# With ASYNC_DB_READS, read routes run on the event loop through this engine
+# instead of the threadpool; writes stay on the sync engine
+async_engine = _create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL))
+AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -17,3 +121,63 @@ def get_db():
         yield db
     finally:
         db.close()
+
+class ThreadedSession:
+    """
+    A sync session with an awaitable execute, the default read session.
+
+    Each statement runs in the threadpool and its rows are buffered there,
+    so the caller never touches the connection on the event loop.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def _execute(self, statement, params=None):
+        return self.session.execute(statement, params).freeze()()
+
+    async def execute(self, statement, params=None):
+        return await run_in_threadpool(self._execute, statement, params)
+
+    async def close(self):
+        await run_in_threadpool(self.session.close)
+
+ReadSession = Union[AsyncSession, ThreadedSession]
+
+@asynccontextmanager
+async def read_session():
+    """A session for read-only queries: AsyncSession with ASYNC_DB_READS, else ThreadedSession."""
+    if ASYNC_DB_READS:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = ThreadedSession(SessionLocal())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+async def get_read_db():
+    async with read_session() as db:
+        yield db
+
+def ensure_columns(metadata):
+    """
+    Add nullable columns declared on the models that an existing table lacks.
+
+    create_all only creates missing tables, so new optional columns would
+    otherwise never reach databases created by an earlier version.
+    """
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+            for col in table.columns:
+                if col.name not in existing and col.nullable and not col.primary_key:
+                    col_type = col.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}")
+
+def ensure_indexes(metadata):
+    """Create any indexes declared on the models that an existing database lacks."""
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
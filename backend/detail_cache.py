@@ -0,0 +1,104 @@
+"""
+Read-through cache of serialized business and event detail payloads.
+
+Detail routes store the JSON body they send, so a hit skips the queries
+and the serialization. Keys include the table versions the route's
+conditional_get dependency already looked up, so any write to those tables
+moves readers to new keys and nothing has to be invalidated; entries for
+old versions are evicted by the LRU or expire after DETAIL_CACHE_TTL.
+
+The backend is an in-process LRU by default, which is per worker. Setting
+DETAIL_CACHE_URL to a redis:// URL (any Redis-compatible server; needs the
+redis package) shares one cache across workers.
+"""
+import logging
+import os
+from typing import Optional
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DETAIL_CACHE_URL = os.getenv("DETAIL_CACHE_URL")
+DETAIL_CACHE_SIZE = int(os.getenv("DETAIL_CACHE_SIZE", 2048))
+DETAIL_CACHE_TTL = float(os.getenv("DETAIL_CACHE_TTL", 300))
+REDIS_KEY_PREFIX = "localbiz:detail:"
+
+def business_key(business_id: int, versions: dict) -> str:
+    return f"business:{business_id}:{versions['businesses']}:{versions['business_photos']}"
+
+def event_key(event_id: int, versions: dict) -> str:
+    return f"event:{event_id}:{versions['events']}:{versions['businesses']}"
+
+class LocalDetailCache:
+    """Bounded in-process LRU with a TTL."""
+
+    def __init__(self, maxsize: int = DETAIL_CACHE_SIZE, ttl: float = DETAIL_CACHE_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self._cache.set(key, value)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+class RedisDetailCache:
+    """
+    Cache in a Redis-compatible server, shared by every worker.
+
+    Server errors are logged and treated as misses rather than failing the
+    request.
+    """
+
+    def __init__(self, url: str, ttl: float = DETAIL_CACHE_TTL):
+        import redis
+        import redis.asyncio
+
+        self._errors = (redis.RedisError, OSError)
+        self._async_client = redis.asyncio.Redis.from_url(url)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self._async_client.get(REDIS_KEY_PREFIX + key)
+        except self._errors as e:
+            self.errors += 1
+            logger.warning("Detail cache read failed: %s", e)
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes):
+        try:
+            await self._async_client.set(REDIS_KEY_PREFIX + key, value, px=int(self.ttl * 1000))
+        except self._errors as e:
+            self.errors += 1
+            logger.warning("Detail cache write failed: %s", e)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+def create_detail_cache(url: Optional[str] = DETAIL_CACHE_URL):
+    if url:
+        try:
+            return RedisDetailCache(url)
+        except ImportError:
+            logger.warning("redis package not installed, detail cache falls back to in-process LRU")
+    return LocalDetailCache()
+
+detail_cache = create_detail_cache()
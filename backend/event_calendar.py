@@ -0,0 +1,165 @@
+"""
+Time-window queries over events, backed by a materialized calendar.
+
+event_calendar holds a row for every day each event overlaps, kept current
+by triggers on events so every write path is covered. "Which events are on
+between a and b" becomes a primary-key range over the days in [a, b]
+followed by an exact overlap check, instead of a scan of every event that
+started before b.
+"""
+import math
+from datetime import date, datetime, time, timedelta
+from typing import Tuple
+
+from sqlalchemy import func, select
+
+from .models import Business, Event, EventCalendarDay
+from .spatial_index import METERS_PER_DEGREE
+
+# Longest span bucketed per event; days beyond it aren't in the calendar
+CALENDAR_MAX_DAYS = 3660
+
+WINDOW_MODES = ("now", "today", "week", "weekend")
+CALENDAR_VIEWS = ("week", "month")
+
+_OFFSETS_DDL = "CREATE TABLE IF NOT EXISTS calendar_offsets (n INTEGER PRIMARY KEY)"
+
+# Days from the event's first to its last, capped to the offsets table
+_SPAN = "MIN(julianday(date(COALESCE({row}.end_date, {row}.start_date))) - julianday(date({row}.start_date)), {max})"
+
+_ADD_EVENT = f"""
+    INSERT INTO event_calendar (day, start_date, event_id)
+    SELECT date(new.start_date, '+' || n || ' days'), new.start_date, new.id
+    FROM calendar_offsets
+    WHERE new.start_date IS NOT NULL AND n <= MAX({_SPAN.format(row="new", max=CALENDAR_MAX_DAYS - 1)}, 0);
+"""
+
+_REMOVE_EVENT = "DELETE FROM event_calendar WHERE event_id = old.id;"
+
+CALENDAR_TRIGGERS_DDL = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_calendar_ai AFTER INSERT ON events
+    BEGIN {_ADD_EVENT} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_calendar_ad AFTER DELETE ON events
+    BEGIN {_REMOVE_EVENT} END
+    """,
+    # One trigger, since SQLite doesn't guarantee the firing order of several
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_calendar_au AFTER UPDATE OF start_date, end_date ON events
+    BEGIN {_REMOVE_EVENT} {_ADD_EVENT} END
+    """,
+)
+
+REBUILD_SQL = f"""
+    INSERT INTO event_calendar (day, start_date, event_id)
+    SELECT date(e.start_date, '+' || o.n || ' days'), e.start_date, e.id
+    FROM events e JOIN calendar_offsets o
+        ON o.n <= MAX({_SPAN.format(row="e", max=CALENDAR_MAX_DAYS - 1)}, 0)
+    WHERE e.start_date IS NOT NULL
+"""
+
+def ensure_event_calendar(engine):
+    """
+    Install the event triggers that keep the calendar current.
+
+    The calendar is backfilled from events when it is empty, e.g. the first
+    time an existing database is started with this schema.
+    """
+    with engine.begin() as conn:
+        conn.exec_driver_sql(_OFFSETS_DDL)
+        if not conn.exec_driver_sql("SELECT 1 FROM calendar_offsets LIMIT 1").first():
+            conn.exec_driver_sql(
+                "INSERT INTO calendar_offsets (n) VALUES (?)", [(n,) for n in range(CALENDAR_MAX_DAYS)]
+            )
+        for ddl in CALENDAR_TRIGGERS_DDL:
+            conn.exec_driver_sql(ddl)
+        has_days = conn.exec_driver_sql("SELECT 1 FROM event_calendar LIMIT 1").first()
+        if not has_days:
+            conn.exec_driver_sql(REBUILD_SQL)
+
+def rebuild_event_calendar(engine):
+    """Recompute every calendar row from the events table."""
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM event_calendar")
+        conn.exec_driver_sql(REBUILD_SQL)
+
+def window_for_mode(mode: str, now: datetime) -> Tuple[datetime, datetime]:
+    """
+    The [start, end] window a named mode covers, from now onwards.
+
+    now: events in progress; today: until midnight; week: the next seven
+    days; weekend: the coming (or current) Saturday and Sunday.
+    """
+    midnight = datetime.combine(now.date(), time.min)
+    if mode == "now":
+        return now, now
+    if mode == "today":
+        return now, midnight + timedelta(days=1)
+    if mode == "week":
+        return now, now + timedelta(days=7)
+    if mode == "weekend":
+        if now.weekday() == 6:
+            saturday = midnight - timedelta(days=1)
+        else:
+            saturday = midnight + timedelta(days=5 - now.weekday())
+        return max(now, saturday), saturday + timedelta(days=2)
+    raise ValueError(f"Unknown window mode: {mode}")
+
+def calendar_range(view: str, day: date) -> Tuple[date, date]:
+    """First and last day of the week (Monday to Sunday) or month containing day."""
+    if view == "week":
+        first = day - timedelta(days=day.weekday())
+        return first, first + timedelta(days=6)
+    if view == "month":
+        first = day.replace(day=1)
+        next_month = (first + timedelta(days=32)).replace(day=1)
+        return first, next_month - timedelta(days=1)
+    raise ValueError(f"Unknown calendar view: {view}")
+
+def filter_overlapping(query, start: datetime, end: datetime):
+    """Restrict an events select to events overlapping [start, end]."""
+    candidates = select(EventCalendarDay.event_id).where(
+        EventCalendarDay.day.between(start.date(), end.date())
+    )
+    return query.filter(
+        Event.id.in_(candidates),
+        Event.start_date <= end,
+        func.coalesce(Event.end_date, Event.start_date) >= start,
+    )
+
+def filter_near(query, lat: float, lon: float, radius: float):
+    """
+    Restrict an events select (joined to Business) to businesses within radius meters.
+
+    Uses an equirectangular distance, plain arithmetic that SQLite can
+    evaluate without math functions; within a city the error is negligible.
+    """
+    dlat = radius / METERS_PER_DEGREE
+    lon_scale = max(math.cos(math.radians(lat)), 0.01)
+    dlon = dlat / lon_scale
+    y = Business.latitude - lat
+    x = (Business.longitude - lon) * lon_scale
+    return query.filter(
+        Business.latitude.between(lat - dlat, lat + dlat),
+        Business.longitude.between(lon - dlon, lon + dlon),
+        y * y + x * x <= dlat * dlat,
+    )
+
+def calendar_query(first: date, last: date):
+    """Select (day, event columns) for every event on each day in [first, last], in day order."""
+    query = select(
+        EventCalendarDay.day,
+        Event.id,
+        Event.title,
+        Event.description,
+        Event.start_date,
+        Event.end_date,
+        Event.location,
+        Business.id.label("business_id"),
+        Business.name.label("business_name"),
+    ).select_from(EventCalendarDay).join(Event, Event.id == EventCalendarDay.event_id).outerjoin(
+        Business, Event.business_id == Business.id
+    ).filter(EventCalendarDay.day.between(first, last))
+    return query.order_by(EventCalendarDay.day, EventCalendarDay.start_date, EventCalendarDay.event_id)
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import os
+import re
+from typing import Optional
+
+import httpx
+
+from .cache import TTLCache, bucket_radius, make_key, snap_point
+from .metrics import track_upstream, upstream_requests, upstream_stale_served
+from .resilience import CircuitBreaker, CircuitOpenError, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+GOOGLE_PLACES_URL = os.getenv(
+    "GOOGLE_PLACES_URL", "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+)
+USER_AGENT = "LocalBusinessDirectory/1.0"
+
+# Per-source deadlines, in seconds
+OVERPASS_DEADLINE = float(os.getenv("OVERPASS_DEADLINE", 25))
+NOMINATIM_DEADLINE = float(os.getenv("NOMINATIM_DEADLINE", 10))
+GOOGLE_PLACES_DEADLINE = float(os.getenv("GOOGLE_PLACES_DEADLINE", 10))
+
+# Cache TTLs per provider, in seconds
+OVERPASS_TTL = 6 * 3600
+NOMINATIM_TTL = 24 * 3600
+GOOGLE_PLACES_TTL = 3600
+# How long expired responses are kept to serve while a provider is failing
+GEODATA_STALE_TTL = float(os.getenv("GEODATA_STALE_TTL", 7 * 24 * 3600))
+
+geodata_cache = TTLCache(
+    maxsize=int(os.getenv("GEODATA_CACHE_SIZE", 512)),
+    ttl=OVERPASS_TTL,
+    path=os.getenv("GEODATA_CACHE_PATH"),
+    stale_ttl=GEODATA_STALE_TTL,
+)
+
+breakers = {name: CircuitBreaker(name) for name in ("overpass", "nominatim", "google_places")}
+inflight = SingleFlight()
+
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            timeout=httpx.Timeout(OVERPASS_DEADLINE, connect=5.0),
+        )
+    return _client
+
+async def close_client():
+    """Close the shared HTTP client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _is_provider_failure(exc: Exception) -> bool:
+    """Whether exc reflects on the provider's health rather than on the request."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, (httpx.TransportError, ValueError))
+
+async def _cached(provider: str, key: str, ttl: float, load):
+    """
+    Return the cached response for key, loading it on a miss.
+
+    Identical concurrent misses share one upstream call. While the
+    provider's circuit is open, or if the call fails, the last response
+    for key is served even if expired; without one the error propagates.
+    """
+    value = await geodata_cache.aget(key)
+    if value is not None:
+        return value
+
+    breaker = breakers[provider]
+
+    async def call():
+        breaker.before_call()
+        try:
+            result = await load()
+        except Exception as exc:
+            if _is_provider_failure(exc):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+        await geodata_cache.aset(key, result, ttl)
+        return result
+
+    try:
+        return await inflight.run(key, call)
+    except Exception as exc:
+        if isinstance(exc, CircuitOpenError):
+            upstream_requests.inc(provider=provider, outcome="circuit_open")
+        stale = await geodata_cache.aget_stale(key)
+        if stale is None:
+            raise
+        logger.warning("Serving stale %s response after: %s", provider, exc)
+        upstream_stale_served.inc(provider=provider)
+        return stale
+
+async def fetch_overpass(query: str, deadline: float = OVERPASS_DEADLINE):
+    """Run an Overpass QL query and return the decoded JSON."""
+    query = re.sub(r"\s+", " ", query).strip()
+
+    async def load():
+        async with track_upstream("overpass"):
+            response = await get_client().post(OVERPASS_URL, data={"data": query}, timeout=deadline)
+            response.raise_for_status()
+            return response.json()
+
+    return await _cached("overpass", make_key("overpass", query=query), OVERPASS_TTL, load)
+
+async def fetch_nominatim(params: dict, deadline: float = NOMINATIM_DEADLINE):
+    """Run a Nominatim search and return the decoded JSON."""
+    async def load():
+        async with track_upstream("nominatim"):
+            response = await get_client().get(NOMINATIM_URL, params=params, timeout=deadline)
+            response.raise_for_status()
+            return response.json()
+
+    return await _cached("nominatim", make_key("nominatim", **params), NOMINATIM_TTL, load)
+
+async def fetch_google_places(
+    lat: float, lon: float, radius: int, place_type: str, api_key: str,
+    deadline: float = GOOGLE_PLACES_DEADLINE,
+):
+    """
+    Run a Google Places nearby search and return the decoded JSON.
+
+    The search is issued around the snapped grid cell with a bucketed radius,
+    so callers must filter results by their exact distance.
+    """
+    lat, lon = snap_point(lat, lon)
+    radius = bucket_radius(radius)
+
+    async def load():
+        params = {"location": f"{lat},{lon}", "radius": radius, "type": place_type, "key": api_key}
+        async with track_upstream("google_places"):
+            response = await get_client().get(GOOGLE_PLACES_URL, params=params, timeout=deadline)
+            response.raise_for_status()
+            return response.json()
+
+    key = make_key("google_places", lat=lat, lon=lon, radius=radius, type=place_type)
+    return await _cached("google_places", key, GOOGLE_PLACES_TTL, load)
+
+async def gather_sources(sources: dict):
+    """
+    Run named upstream calls concurrently, each under its own deadline.
+
+    sources maps a name to an (awaitable, deadline) pair. Returns
+    (results, errors): results maps each source that finished in time to its
+    value, errors maps failed or timed-out sources to the exception.
+    """
+    names = list(sources)
+    outcomes = await asyncio.gather(
+        *(asyncio.wait_for(awaitable, deadline) for awaitable, deadline in sources.values()),
+        return_exceptions=True,
+    )
+    results, errors = {}, {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, Exception):
+            errors[name] = outcome
+        else:
+            results[name] = outcome
+    return results, errors
+
+def bbox_places_query(south: float, west: float, north: float, east: float) -> str:
+    """Overpass query for every named amenity or shop inside a bounding box."""
+    bbox = f"{south},{west},{north},{east}"
+    return f"""
+    [out:json][timeout:25];
+    (
+      node["name"]["amenity"]({bbox});
+      way["name"]["amenity"]({bbox});
+      node["name"]["shop"]({bbox});
+      way["name"]["shop"]({bbox});
+    );
+    out center;
+    """
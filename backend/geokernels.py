@@ -0,0 +1,91 @@
+"""
+Vectorized distance and ranking kernels over arrays of coordinates.
+
+The nearby search measures every candidate in the queried cells and keeps a
+small page of them; doing the trigonometry in NumPy and selecting the page
+with argpartition avoids per-element Python math and a full sort.
+"""
+from typing import Optional
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+def haversine_m_array(lat, lon, lats, lons) -> np.ndarray:
+    """
+    Great-circle distances in meters, element-wise over broadcastable inputs.
+
+    Pass a point and arrays for distances from one point, or column and row
+    vectors for a pairwise matrix.
+    """
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(np.subtract(lons, lon))
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def _first_smallest(indices, values, count: int) -> np.ndarray:
+    """The count entries of ascending indices with the smallest values, ties by index."""
+    if count >= len(indices):
+        return indices
+    kth = values[np.argpartition(values, count - 1)[count - 1]]
+    below = indices[values < kth]
+    return np.concatenate((below, indices[values == kth][:count - len(below)]))
+
+def top_k_indices(keys, k: int, tiebreak=None) -> np.ndarray:
+    """
+    Indices of the k smallest keys, in ascending order.
+
+    argpartition finds the k-th key in linear time; only candidates up to it
+    are sorted. Ties are ordered by tiebreak (ascending) and then by index,
+    so the result doesn't depend on how the partition split equal keys. Of
+    the keys equal to the k-th, only as many as are still needed are kept,
+    picked the same way, so a large tie doesn't turn into a full sort.
+    """
+    keys = np.asarray(keys, dtype=float)
+    n = len(keys)
+    if tiebreak is None:
+        tiebreak = np.zeros(n)
+    else:
+        tiebreak = np.asarray(tiebreak, dtype=float)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        kth = keys[np.argpartition(keys, k - 1)[k - 1]]
+        below = np.flatnonzero(keys < kth)
+        tied = np.flatnonzero(keys == kth)
+        candidates = np.concatenate((below, _first_smallest(tied, tiebreak[tied], k - len(below))))
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, tiebreak[candidates], keys[candidates]))
+    return candidates[order][:k]
+
+def dedupe_by_distance(names, lats, lons, radius_m: float, keys: Optional[list] = None) -> np.ndarray:
+    """
+    Indices of entries to keep, dropping later entries within radius_m of an
+    earlier kept entry with the same key (names lowercased by default).
+
+    Distances are only computed within each group of equal keys, as one
+    pairwise matrix per group.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    groups = {}
+    for i, key in enumerate(keys if keys is not None else (name.lower() for name in names)):
+        groups.setdefault(key, []).append(i)
+
+    keep = np.ones(len(lats), dtype=bool)
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members = np.array(members)
+        close = haversine_m_array(
+            lats[members, None], lons[members, None], lats[None, members], lons[None, members]
+        ) <= radius_m
+        for position, index in enumerate(members):
+            if keep[index]:
+                # Later members near a kept one are duplicates of it
+                later = members[position + 1:]
+                keep[later[close[position, position + 1:]]] = False
+    return np.flatnonzero(keep)
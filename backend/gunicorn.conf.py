@@ -0,0 +1,70 @@
+"""
+Production serving profile: a gunicorn master forking uvicorn workers.
+
+    gunicorn -c backend/gunicorn.conf.py backend.main:app
+
+The app is imported once in the master (preload), so the schema checks in
+backend.main run once rather than per worker. The master then warms the
+institution and nearby snapshots and the spatial index before forking, so
+workers inherit them and none serves its first requests cold. Workers share
+the snapshot file at SNAPSHOT_PATH: one of them holds its lock and keeps it
+refreshed, the others reload it when it changes.
+
+Each worker keeps its own spatial index for nearby search and polls the
+businesses table version every SPATIAL_INDEX_SYNC_INTERVAL seconds, so
+writes through other workers (and recycled workers, forked from the
+master's index) catch up within that interval.
+"""
+import multiprocessing
+import os
+
+# Read by backend.refresh when the app is imported, after this file
+os.environ.setdefault("SNAPSHOT_PATH", "./snapshots.json")
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("KEEPALIVE", 5))
+# Recycle workers now and then to bound memory growth; the index sync brings
+# a recycled worker's nearby results up to date
+max_requests = int(os.getenv("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+accesslog = os.getenv("ACCESS_LOG") or None
+
+WARM_SNAPSHOTS = os.getenv("WARM_SNAPSHOTS", "1") == "1"
+
+def on_starting(server):
+    """Warm shared state in the master, before it listens or forks workers."""
+    if not WARM_SNAPSHOTS:
+        return
+    import asyncio
+
+    from backend.routers.businesses import warm_snapshots
+
+    server.log.info("Warming snapshots")
+    asyncio.run(_warm(warm_snapshots))
+
+async def _warm(warm_snapshots):
+    from backend.database import async_engine
+    from backend.geodata import close_client
+
+    try:
+        await warm_snapshots()
+    finally:
+        # Connections are bound to this event loop; workers open their own
+        await close_client()
+        await async_engine.dispose()
+
+def post_fork(server, worker):
+    """
+    Drop pooled database connections inherited from the master without
+    closing them. The geodata disk cache reopens its own SQLite connection
+    in each worker (see TTLCache._connection).
+    """
+    from backend.database import async_engine, engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
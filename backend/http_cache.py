@@ -0,0 +1,144 @@
+"""
+Conditional GET support for the read endpoints.
+
+Triggers bump a per-table version in table_versions on every write, so a
+route's ETag is a hash of the request and the versions of the tables it
+reads. A matching If-None-Match (or an unchanged If-Modified-Since) is
+answered with 304 after that single primary-key lookup, before the route's
+own query runs.
+"""
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import select
+
+from .database import ReadSession, get_read_db
+from .models import TableVersion
+from .refresh import snapshots
+
+VERSIONED_TABLES = ("businesses", "business_photos", "business_rating_summaries", "events")
+
+# Per-route Cache-Control policies
+LIST_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+DETAIL_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+SNAPSHOT_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=3600"
+
+_BUMP_VERSION = """
+    INSERT INTO table_versions (table_name, version, updated_at)
+    VALUES ('{table}', 1, (julianday('now') - 2440587.5) * 86400.0)
+    ON CONFLICT (table_name) DO UPDATE SET
+        version = version + 1,
+        updated_at = excluded.updated_at;
+"""
+
+def _version_triggers(table: str):
+    for suffix, operation in (("ai", "INSERT"), ("ad", "DELETE"), ("au", "UPDATE")):
+        yield f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} AFTER {operation} ON {table}
+        BEGIN {_BUMP_VERSION.format(table=table)} END
+        """
+
+def ensure_table_versions(engine):
+    """Install the triggers that bump table_versions on every write."""
+    with engine.begin() as conn:
+        for table in VERSIONED_TABLES:
+            for ddl in _version_triggers(table):
+                conn.exec_driver_sql(ddl)
+
+async def table_versions(db: ReadSession, tables: Iterable[str]) -> dict:
+    """Map each table to (version, updated_at); unseen tables are (0, None)."""
+    tables = list(tables)
+    versions = {table: (0, None) for table in tables}
+    rows = await db.execute(
+        select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at).where(
+            TableVersion.table_name.in_(tables)
+        )
+    )
+    for row in rows:
+        versions[row.table_name] = (row.version, row.updated_at)
+    return versions
+
+def _not_modified_since(request: Request, last_modified: float) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        return int(last_modified) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+def conditional_get(
+    tables: Iterable[str] = (),
+    snapshot_keys: Iterable[str] = (),
+    cache_control: str = LIST_CACHE_CONTROL,
+    time_bucket: Optional[int] = None,
+):
+    """
+    Dependency adding ETag, Last-Modified and Cache-Control to a GET route.
+
+    The validator covers the method, path, query string and Accept header,
+    the versions of the given tables, the update times of the given refresh
+    snapshots and, for routes whose result depends on the clock, the current
+    time_bucket-second window.
+    """
+    tables = tuple(tables)
+    snapshot_keys = tuple(snapshot_keys)
+
+    async def dependency(request: Request, db: ReadSession = Depends(get_read_db)):
+        versions = await table_versions(db, tables) if tables else {}
+        parts = [request.method, request.url.path, str(request.query_params), request.headers.get("accept", "")]
+        parts += [f"{table}={version}" for table, (version, _) in sorted(versions.items())]
+        updated = [updated_at for _, updated_at in versions.values() if updated_at]
+        for key in snapshot_keys:
+            updated_at = snapshots.updated_at(key)
+            parts.append(f"{key}={updated_at}")
+            if updated_at:
+                updated.append(updated_at)
+        if time_bucket:
+            parts.append(str(int(time.time() // time_bucket)))
+
+        etag = 'W/"%s"' % hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest()
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept"}
+        last_modified = max(updated) if updated and not time_bucket else None
+        if last_modified:
+            headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            not_modified = etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        else:
+            not_modified = last_modified is not None and _not_modified_since(request, last_modified)
+        if not_modified:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        # Applied to the final response by CacheHeadersMiddleware, which also
+        # covers routes that return a Response object directly
+        request.state.cache_headers = headers
+        # Lets the route key cached bodies on the versions behind the ETag
+        request.state.table_versions = {table: version for table, (version, _) in versions.items()}
+
+    return Depends(dependency)
+
+class CacheHeadersMiddleware:
+    """Copy the headers chosen by conditional_get onto successful responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = scope.get("state", {}).get("cache_headers")
+                if headers:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
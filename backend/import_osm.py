@@ -0,0 +1,176 @@
+"""
+Bulk-load an Overpass JSON dump into the businesses table.
+
+The dump is stream-parsed element by element, so city or state extracts
+(optionally gzipped) load in constant memory. Rows are upserted on their
+OSM id in batched transactions, and an "image" tag becomes the business's
+main photo.
+
+Usage: python -m backend.import_osm data/osm_coimbatore.json [--batch-size 2000]
+"""
+import argparse
+import gzip
+import sys
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+from .database import engine, ensure_columns, ensure_indexes
+from .event_calendar import ensure_event_calendar
+from .http_cache import ensure_table_versions
+from .models import Base
+from .osm import element_coordinates, iter_overpass_elements
+from .ratings import ensure_rating_summaries
+from .search import ensure_fts_index
+
+CATEGORY_TAGS = ("amenity", "shop", "tourism", "leisure", "office", "craft", "healthcare")
+
+UPSERT_BUSINESS_SQL = """
+INSERT INTO businesses (
+    osm_id, name, description, category, address, latitude, longitude,
+    phone, email, website, operating_hours, is_verified, is_featured, created_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, ?)
+ON CONFLICT (osm_id) DO UPDATE SET
+    name = excluded.name,
+    description = COALESCE(excluded.description, businesses.description),
+    category = excluded.category,
+    address = COALESCE(excluded.address, businesses.address),
+    latitude = excluded.latitude,
+    longitude = excluded.longitude,
+    phone = COALESCE(excluded.phone, businesses.phone),
+    email = COALESCE(excluded.email, businesses.email),
+    website = COALESCE(excluded.website, businesses.website),
+    operating_hours = COALESCE(excluded.operating_hours, businesses.operating_hours)
+"""
+
+INSERT_PHOTO_SQL = """
+INSERT INTO business_photos (business_id, url, is_main)
+SELECT ?, ?, 1
+WHERE NOT EXISTS (SELECT 1 FROM business_photos WHERE business_id = ? AND url = ?)
+"""
+
+def _address(tags: dict) -> Optional[str]:
+    if tags.get("addr:full"):
+        return tags["addr:full"]
+    street = " ".join(filter(None, (tags.get("addr:housenumber"), tags.get("addr:street"))))
+    parts = [street, tags.get("addr:city"), tags.get("addr:postcode")]
+    return ", ".join(filter(None, parts)) or None
+
+def normalize_element(element: dict) -> Optional[dict]:
+    """Map an Overpass element onto Business columns, or None to skip it."""
+    tags = element.get("tags") or {}
+    name = tags.get("name", "").strip()
+    coords = element_coordinates(element)
+    if len(name) <= 2 or coords is None:
+        return None
+
+    category = next((tags[tag] for tag in CATEGORY_TAGS if tags.get(tag)), "business")
+    return {
+        "osm_id": f"{element.get('type', 'node')}/{element['id']}",
+        "name": name,
+        "description": tags.get("description"),
+        "category": category,
+        "address": _address(tags),
+        "latitude": coords[0],
+        "longitude": coords[1],
+        "phone": tags.get("phone") or tags.get("contact:phone"),
+        "email": tags.get("email") or tags.get("contact:email"),
+        "website": tags.get("website") or tags.get("contact:website"),
+        "operating_hours": tags.get("opening_hours"),
+        "photo_url": tags.get("image"),
+    }
+
+def _write_batch(rows):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(UPSERT_BUSINESS_SQL, [
+            (
+                row["osm_id"], row["name"], row["description"], row["category"], row["address"],
+                row["latitude"], row["longitude"], row["phone"], row["email"], row["website"],
+                row["operating_hours"], now,
+            )
+            for row in rows
+        ])
+
+        with_photos = {row["osm_id"]: row["photo_url"] for row in rows if row["photo_url"]}
+        osm_ids = list(with_photos)
+        # Chunked to stay under SQLite's bound-parameter limit
+        for i in range(0, len(osm_ids), 500):
+            chunk = osm_ids[i:i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            ids = conn.exec_driver_sql(
+                f"SELECT osm_id, id FROM businesses WHERE osm_id IN ({placeholders})", tuple(chunk)
+            ).fetchall()
+            conn.exec_driver_sql(INSERT_PHOTO_SQL, [
+                (business_id, with_photos[osm_id], business_id, with_photos[osm_id])
+                for osm_id, business_id in ids
+            ])
+
+def import_elements(elements: Iterable[dict], batch_size: int = 2000, progress=None) -> dict:
+    """Upsert elements in batches; returns counts and throughput."""
+    start = time.perf_counter()
+    seen = imported = skipped = 0
+    batch = {}
+
+    def flush():
+        nonlocal imported
+        if batch:
+            _write_batch(list(batch.values()))
+            imported += len(batch)
+            batch.clear()
+            if progress:
+                elapsed = time.perf_counter() - start
+                progress(f"{imported} rows imported, {imported / elapsed:.0f} rows/s")
+
+    for element in elements:
+        seen += 1
+        row = normalize_element(element)
+        if row is None:
+            skipped += 1
+            continue
+        # Later duplicates in a batch win, matching the upsert semantics
+        batch[row["osm_id"]] = row
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "elements": seen,
+        "imported": imported,
+        "skipped": skipped,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(imported / elapsed) if elapsed else 0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load an Overpass JSON dump into businesses.")
+    parser.add_argument("path", help="Overpass JSON file, optionally .gz")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(Base.metadata)
+    ensure_indexes(Base.metadata)
+    # Install the triggers before writing, as the app does at startup, so the
+    # search index, rating summaries, ETag versions and calendar stay in sync
+    ensure_fts_index(engine)
+    ensure_rating_summaries(engine)
+    ensure_table_versions(engine)
+    ensure_event_calendar(engine)
+
+    opener = gzip.open if args.path.endswith(".gz") else open
+    with opener(args.path, "rt", encoding="utf-8") as fp:
+        stats = import_elements(
+            iter_overpass_elements(fp),
+            batch_size=args.batch_size,
+            progress=lambda message: print(message, file=sys.stderr),
+        )
+
+    print(
+        f"Imported {stats['imported']} of {stats['elements']} elements "
+        f"in {stats['seconds']}s ({stats['rows_per_second']} rows/s)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,70 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from .auth import user_cache
+from .database import async_engine, engine, ensure_columns, ensure_indexes
+from .detail_cache import detail_cache
+from .event_calendar import ensure_event_calendar
+from .geodata import breakers, close_client, geodata_cache, inflight
+from .hashing import hashing_pool
+from .http_cache import CacheHeadersMiddleware, ensure_table_versions
+from .metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, instrument_engine, register_collector, render_metrics
 from .models import Base
+from .refresh import REFRESH_ENABLED, REFRESH_LOCK_PATH, scheduler
+from .ratings import ensure_rating_summaries
+from .search import ensure_fts_index
+from .spatial_index import SYNC_INTERVAL, sync_scheduler
 from .routers import businesses, auth, events
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+ensure_columns(Base.metadata)
+ensure_indexes(Base.metadata)
+ensure_fts_index(engine)
+ensure_rating_summaries(engine)
+ensure_table_versions(engine)
+ensure_event_calendar(engine)
 
-app = FastAPI(title="Local Business Directory API", version="1.0.0")
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+register_collector("geodata_cache", geodata_cache.stats)
+register_collector("geodata_inflight", inflight.stats)
+for provider, breaker in breakers.items():
+    register_collector(f"circuit_{provider}", breaker.stats)
+register_collector("detail_cache", detail_cache.stats)
+register_collector("user_cache", user_cache.stats)
+register_collector("password_hashing", hashing_pool.stats)
+register_collector("refresh_scheduler", scheduler.stats)
+register_collector("spatial_index_sync", sync_scheduler.stats)
+if hasattr(engine.pool, "checkedout"):
+    register_collector("db_pool", lambda: {
+        "size": engine.pool.size(),
+        "checked_out": engine.pool.checkedout(),
+        "checked_in": engine.pool.checkedin(),
+    })
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if REFRESH_ENABLED:
+        businesses.register_refresh_jobs()
+        # Behind several workers, one of them refreshes the shared snapshots
+        scheduler.start(lock_path=REFRESH_LOCK_PATH or None)
+    if SYNC_INTERVAL > 0:
+        sync_scheduler.start()
+    yield
+    await sync_scheduler.stop()
+    await scheduler.stop()
+    # Release pooled upstream and database connections
+    await close_client()
+    await async_engine.dispose()
+
+app = FastAPI(
+    title="Local Business Directory API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # CORS middleware
 app.add_middleware(
@@ -17,6 +74,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CacheHeadersMiddleware)
+# Outermost, so timings include every other middleware
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(businesses.router, prefix="/businesses", tags=["businesses"])
@@ -26,3 +86,7 @@ app.include_router(events.router, prefix="/events", tags=["events"])
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Local Business Directory API"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,230 @@
+"""
+Request, database and upstream instrumentation in Prometheus text format.
+
+MetricsMiddleware times every request per route template; SQLAlchemy
+cursor hooks count and time the statements each request issues; geodata
+wraps upstream calls in track_upstream. Everything is rendered by
+render_metrics for the /metrics endpoint.
+
+With SLOW_REQUEST_MS set, requests slower than that are logged together
+with the SQL they ran.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 0))  # 0 disables the slow-request log
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join('%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"')) for name, value in labels)
+    return "{%s}" % pairs
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(labels)} {value}"
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {series[-1]}"
+            yield f"{self.name}_sum{_format_labels(labels)} {series[-2]}"
+            yield f"{self.name}_count{_format_labels(labels)} {series[-1]}"
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status.")
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency by route.")
+db_statements = Counter("db_statements_total", "SQL statements executed, by statement type.")
+db_statement_latency = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time by statement type.", STATEMENT_BUCKETS
+)
+db_statements_per_request = Histogram(
+    "db_statements_per_request", "SQL statements issued per HTTP request, by route.", COUNT_BUCKETS
+)
+db_time_per_request = Histogram("db_time_per_request_seconds", "Time spent in SQL per HTTP request, by route.")
+upstream_requests = Counter("upstream_requests_total", "Upstream API calls by provider and outcome.")
+upstream_latency = Histogram("upstream_request_duration_seconds", "Upstream API call latency by provider.")
+upstream_stale_served = Counter(
+    "upstream_stale_served_total", "Expired cached responses served because a provider failed, by provider."
+)
+
+METRICS = [
+    http_requests, http_latency,
+    db_statements, db_statement_latency, db_statements_per_request, db_time_per_request,
+    upstream_requests, upstream_latency, upstream_stale_served,
+]
+
+# Gauges read on each scrape: name -> function returning a dict of numbers
+_collectors: Dict[str, Callable[[], dict]] = {}
+
+def register_collector(name: str, stats: Callable[[], dict]):
+    """Expose the numeric fields of stats() as <name>_<field> gauges."""
+    _collectors[name] = stats
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for name, stats in sorted(_collectors.items()):
+        for field, value in stats().items():
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, (int, float)):
+                lines.append(f"# TYPE {name}_{field} gauge")
+                lines.append(f"{name}_{field} {value}")
+    return "\n".join(lines) + "\n"
+
+class _RequestStats:
+    __slots__ = ("statements", "db_seconds", "sql")
+
+    def __init__(self, capture_sql: bool):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.sql = [] if capture_sql else None
+
+_request_stats: contextvars.ContextVar[Optional[_RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+def instrument_engine(engine):
+    """Count and time every statement the engine executes."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_statements.inc(kind=kind)
+        db_statement_latency.observe(elapsed, kind=kind)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+            if stats.sql is not None:
+                stats.sql.append(f"{elapsed * 1000:.1f}ms {' '.join(statement.split())}")
+
+@asynccontextmanager
+async def track_upstream(provider: str):
+    """Time an upstream call, recording ok, error or timeout."""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except asyncio.CancelledError:
+        # gather_sources cancels calls that overrun their deadline
+        outcome = "timeout"
+        raise
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        upstream_requests.inc(provider=provider, outcome=outcome)
+        upstream_latency.observe(time.perf_counter() - start, provider=provider)
+
+def _route_template(scope) -> str:
+    """The matched route's path template, to keep label cardinality bounded."""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    for route in scope["app"].router.routes:
+        if getattr(route, "endpoint", None) is endpoint:
+            return route.path
+    return "unmatched"
+
+class MetricsMiddleware:
+    """Record latency, status and SQL usage for every HTTP request."""
+
+    def __init__(self, app, slow_request_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = _RequestStats(capture_sql=bool(self.slow_request_ms))
+        token = _request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            route = _route_template(scope)
+            method = scope["method"]
+            http_requests.inc(method=method, route=route, status=status_code)
+            http_latency.observe(elapsed, method=method, route=route)
+            db_statements_per_request.observe(stats.statements, route=route)
+            db_time_per_request.observe(stats.db_seconds, route=route)
+
+            if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+                logger.warning(
+                    "Slow request %s %s took %.0fms (%d statements, %.0fms in SQL)%s",
+                    method, scope["path"], elapsed * 1000, stats.statements, stats.db_seconds * 1000,
+                    "".join(f"\n  {sql}" for sql in stats.sql),
+                )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -36,18 +36,27 @@ class Business(Base):
     operating_hours = Column(String)
     is_verified = Column(Boolean, default=False)
     is_featured = Column(Boolean, default=False)
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+    osm_id = Column(String)  # e.g. "node/123" for rows imported from OpenStreetMap
     created_at = Column(DateTime, default=datetime.utcnow)
 
     owner = relationship("User", back_populates="businesses")
     reviews = relationship("Review", back_populates="business")
     photos = relationship("BusinessPhoto", back_populates="business")
+    rating_summary = relationship("BusinessRatingSummary", back_populates="business", uselist=False)
+
+    __table_args__ = (
+        # Category filter, optionally paged in id order
+        Index("ix_businesses_category_id", "category", "id"),
+        # Upsert target for OSM imports
+        Index("ix_businesses_osm_id", "osm_id", unique=True),
+    )
 
 class BusinessPhoto(Base):
     __tablename__ = "business_photos"
 
     id = Column(Integer, primary_key=True, index=True)
-    business_id = Column(Integer, ForeignKey("businesses.id"))
+    business_id = Column(Integer, ForeignKey("businesses.id"), index=True)
     url = Column(String)
     is_main = Column(Boolean, default=False)
 
@@ -57,8 +66,8 @@ class Review(Base):
     __tablename__ = "reviews"
 
     id = Column(Integer, primary_key=True, index=True)
-    business_id = Column(Integer, ForeignKey("businesses.id"))
-    user_id = Column(Integer, ForeignKey("users.id"))
+    business_id = Column(Integer, ForeignKey("businesses.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     rating = Column(Integer)  # 1-5 stars
     comment = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -67,11 +76,35 @@ class Review(Base):
     user = relationship("User", back_populates="reviews")
     photos = relationship("ReviewPhoto", back_populates="review")
 
+class BusinessRatingSummary(Base):
+    """Review aggregates per business, maintained by triggers on reviews."""
+    __tablename__ = "business_rating_summaries"
+
+    business_id = Column(Integer, ForeignKey("businesses.id"), primary_key=True)
+    review_count = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    rating_1 = Column(Integer, default=0, nullable=False)
+    rating_2 = Column(Integer, default=0, nullable=False)
+    rating_3 = Column(Integer, default=0, nullable=False)
+    rating_4 = Column(Integer, default=0, nullable=False)
+    rating_5 = Column(Integer, default=0, nullable=False)
+    average_rating = Column(Float, index=True)
+
+    business = relationship("Business", back_populates="rating_summary")
+
+class TableVersion(Base):
+    """Change counter per table, bumped by triggers; drives HTTP ETags."""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(Float)  # unix time of the last change
+
 class ReviewPhoto(Base):
     __tablename__ = "review_photos"
 
     id = Column(Integer, primary_key=True, index=True)
-    review_id = Column(Integer, ForeignKey("reviews.id"))
+    review_id = Column(Integer, ForeignKey("reviews.id"), index=True)
     url = Column(String)
 
     review = relationship("Review", back_populates="photos")
@@ -82,10 +115,28 @@ class Event(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     description = Column(Text)
-    business_id = Column(Integer, ForeignKey("businesses.id"))
+    business_id = Column(Integer, ForeignKey("businesses.id"), index=True)
     start_date = Column(DateTime)
     end_date = Column(DateTime)
     location = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     business = relationship("Business")
+
+    __table_args__ = (
+        # Keyset pagination on (start_date, id)
+        Index("ix_events_start_date_id", "start_date", "id"),
+    )
+
+class EventCalendarDay(Base):
+    """One row per day an event overlaps, kept in sync by triggers on events."""
+    __tablename__ = "event_calendar"
+
+    day = Column(Date, primary_key=True)
+    start_date = Column(DateTime, primary_key=True)
+    event_id = Column(Integer, primary_key=True)
+
+    __table_args__ = (
+        # Trigger maintenance when an event is rescheduled or deleted
+        Index("ix_event_calendar_event_id", "event_id"),
+    )
@@ -0,0 +1,69 @@
+import json
+import re
+
+ELEMENTS_START = re.compile(r'"elements"\s*:\s*\[')
+
+def iter_overpass_elements(fp, chunk_size=1 << 16):
+    """
+    Stream elements out of an Overpass JSON document without loading it whole.
+
+    Yields each element of the top-level "elements" array as it is decoded.
+    A truncated dump simply stops at the last complete element.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    eof = False
+
+    def fill():
+        nonlocal buf, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf += chunk
+
+    # Locate the opening bracket of the elements array
+    while True:
+        idx = buf.find('"elements"')
+        if idx != -1:
+            match = ELEMENTS_START.match(buf, idx)
+            if match:
+                buf = buf[match.end():]
+                break
+        if eof:
+            return
+        fill()
+
+    pos = 0
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                return
+            buf, pos = "", 0
+            fill()
+            continue
+        if buf[pos] == "]":
+            return
+
+        try:
+            element, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                return
+            buf, pos = buf[pos:], 0
+            fill()
+            continue
+
+        yield element
+        pos = end
+        if pos > chunk_size:
+            buf, pos = buf[pos:], 0
+
+def element_coordinates(element):
+    """Return (lat, lon) for a node or the center of a way, or None."""
+    lat = element.get("lat", element.get("center", {}).get("lat", 0))
+    lon = element.get("lon", element.get("center", {}).get("lon", 0))
+    if lat and lon:
+        return float(lat), float(lon)
+    return None
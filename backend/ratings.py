@@ -0,0 +1,96 @@
+from sqlalchemy import select
+
+from .models import BusinessRatingSummary
+
+STARS = range(1, 6)
+
+def _histogram(row: str, sign: str) -> str:
+    return ", ".join(f"rating_{star} = rating_{star} {sign} ({row}.rating = {star})" for star in STARS)
+
+# Adds a review to its business summary, creating the summary row if needed
+_ADD_REVIEW = f"""
+    INSERT INTO business_rating_summaries
+        (business_id, review_count, rating_sum, {", ".join(f"rating_{star}" for star in STARS)}, average_rating)
+    VALUES
+        (new.business_id, 1, new.rating, {", ".join(f"new.rating = {star}" for star in STARS)}, new.rating)
+    ON CONFLICT (business_id) DO UPDATE SET
+        review_count = review_count + 1,
+        rating_sum = rating_sum + new.rating,
+        {_histogram("new", "+")},
+        average_rating = CAST(rating_sum + new.rating AS REAL) / (review_count + 1);
+"""
+
+# Removes a review from its business summary
+_REMOVE_REVIEW = f"""
+    UPDATE business_rating_summaries SET
+        review_count = review_count - 1,
+        rating_sum = rating_sum - old.rating,
+        {_histogram("old", "-")},
+        average_rating = CASE WHEN review_count > 1
+            THEN CAST(rating_sum - old.rating AS REAL) / (review_count - 1) END
+    WHERE business_id = old.business_id;
+"""
+
+_COUNTED_NEW = "new.business_id IS NOT NULL AND new.rating BETWEEN 1 AND 5"
+_COUNTED_OLD = "old.business_id IS NOT NULL AND old.rating BETWEEN 1 AND 5"
+
+RATING_TRIGGERS_DDL = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS reviews_summary_ai AFTER INSERT ON reviews
+    WHEN {_COUNTED_NEW} BEGIN {_ADD_REVIEW} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS reviews_summary_ad AFTER DELETE ON reviews
+    WHEN {_COUNTED_OLD} BEGIN {_REMOVE_REVIEW} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS reviews_summary_au_old AFTER UPDATE OF rating, business_id ON reviews
+    WHEN {_COUNTED_OLD} BEGIN {_REMOVE_REVIEW} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS reviews_summary_au_new AFTER UPDATE OF rating, business_id ON reviews
+    WHEN {_COUNTED_NEW} BEGIN {_ADD_REVIEW} END
+    """,
+)
+
+REBUILD_SQL = f"""
+    INSERT INTO business_rating_summaries
+        (business_id, review_count, rating_sum, {", ".join(f"rating_{star}" for star in STARS)}, average_rating)
+    SELECT business_id, COUNT(*), SUM(rating),
+        {", ".join(f"SUM(rating = {star})" for star in STARS)},
+        AVG(rating)
+    FROM reviews
+    WHERE business_id IS NOT NULL AND rating BETWEEN 1 AND 5
+    GROUP BY business_id
+"""
+
+def ensure_rating_summaries(engine):
+    """
+    Install the review triggers that keep rating summaries current.
+
+    Summaries are backfilled from reviews when the table is empty, e.g. the
+    first time an existing database is started with this schema.
+    """
+    with engine.begin() as conn:
+        for ddl in RATING_TRIGGERS_DDL:
+            conn.exec_driver_sql(ddl)
+        has_summaries = conn.exec_driver_sql("SELECT 1 FROM business_rating_summaries LIMIT 1").first()
+        if not has_summaries:
+            conn.exec_driver_sql(REBUILD_SQL)
+
+def rebuild_rating_summaries(engine):
+    """Recompute every summary from the reviews table."""
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM business_rating_summaries")
+        conn.exec_driver_sql(REBUILD_SQL)
+
+async def get_ratings(db, business_ids) -> dict:
+    """Map business id to (average_rating, review_count) for the given ids."""
+    if not business_ids:
+        return {}
+    rows = await db.execute(select(
+        BusinessRatingSummary.business_id,
+        BusinessRatingSummary.average_rating,
+        BusinessRatingSummary.review_count,
+    ).where(BusinessRatingSummary.business_id.in_(list(business_ids))))
+    return {row.business_id: (row.average_rating, row.review_count) for row in rows}
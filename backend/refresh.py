@@ -0,0 +1,222 @@
+"""
+Background refresh of slow upstream-derived data.
+
+Jobs run on a fixed interval with jitter inside the app's event loop and
+back off exponentially while they fail. Each successful run replaces the
+job's last good snapshot, which request handlers serve directly so they
+never wait on the network. Snapshots are also written to disk so a restart
+while upstreams are unreachable still has data to serve.
+
+With several worker processes sharing one snapshot file, only the worker
+holding the file's lock runs the jobs; the others reload the file when it
+changes.
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+REFRESH_ENABLED = os.getenv("REFRESH_ENABLED", "1") == "1"
+REFRESH_INTERVAL = float(os.getenv("REFRESH_INTERVAL", 30 * 60))
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", 0.1))  # fraction of the interval
+REFRESH_BACKOFF_BASE = float(os.getenv("REFRESH_BACKOFF_BASE", 30))
+REFRESH_BACKOFF_MAX = float(os.getenv("REFRESH_BACKOFF_MAX", 30 * 60))
+REFRESH_STARTUP_SPREAD = float(os.getenv("REFRESH_STARTUP_SPREAD", 5))  # seconds
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
+SNAPSHOT_RELOAD_INTERVAL = float(os.getenv("SNAPSHOT_RELOAD_INTERVAL", 1))  # seconds between file checks
+REFRESH_LOCK_PATH = os.getenv("REFRESH_LOCK_PATH", f"{SNAPSHOT_PATH}.lock" if SNAPSHOT_PATH else "")
+REFRESH_LOCK_RETRY = float(os.getenv("REFRESH_LOCK_RETRY", 30))  # seconds
+
+class SnapshotStore:
+    """
+    Last good value per key, optionally mirrored to a JSON file.
+
+    The file is re-read when another process replaces it, checked at most
+    every SNAPSHOT_RELOAD_INTERVAL seconds.
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: float = SNAPSHOT_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, dict] = {}
+        self._mtime_ns: Optional[int] = None
+        self._checked_at = 0.0
+        if path:
+            self._reload()
+
+    def _reload(self):
+        """Load the file if it changed since it was last read."""
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fp:
+                self._snapshots = json.load(fp)
+        except (OSError, ValueError) as error:
+            logger.warning("Ignoring unreadable snapshot file %s: %r", self.path, error)
+        self._mtime_ns = mtime_ns
+
+    def _snapshot(self, key: str) -> Optional[dict]:
+        if self.path:
+            now = time.monotonic()
+            if now - self._checked_at >= self.reload_interval:
+                self._checked_at = now
+                with self._lock:
+                    self._reload()
+        return self._snapshots.get(key)
+
+    def get(self, key: str):
+        snapshot = self._snapshot(key)
+        return snapshot["data"] if snapshot else None
+
+    def updated_at(self, key: str) -> Optional[float]:
+        snapshot = self._snapshot(key)
+        return snapshot["updated_at"] if snapshot else None
+
+    def set(self, key: str, data):
+        with self._lock:
+            if self.path:
+                # Keep keys another process wrote since the last read
+                self._reload()
+            self._snapshots[key] = {"data": data, "updated_at": time.time()}
+            if self.path:
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as fp:
+                    json.dump(self._snapshots, fp)
+                os.replace(tmp_path, self.path)
+                self._mtime_ns = os.stat(self.path).st_mtime_ns
+
+class RefreshScheduler:
+    """Runs each registered job periodically as its own asyncio task."""
+
+    def __init__(
+        self,
+        interval: float = REFRESH_INTERVAL,
+        jitter: float = REFRESH_JITTER,
+        backoff_base: float = REFRESH_BACKOFF_BASE,
+        backoff_max: float = REFRESH_BACKOFF_MAX,
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.running = False
+        self._jobs: Dict[str, Callable[[], Awaitable]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._failures: Dict[str, int] = {}
+        self._lock_fd: Optional[int] = None
+        self._lock_task: Optional[asyncio.Task] = None
+
+    def _jittered(self, delay: float) -> float:
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def add_job(self, name: str, job: Callable[[], Awaitable], run_now: bool = False):
+        """Register or replace a job; it starts at once if the scheduler is running."""
+        self._jobs[name] = job
+        if self.running and name not in self._tasks:
+            delay = random.uniform(0, REFRESH_STARTUP_SPREAD) if run_now else self._jittered(self.interval)
+            self._start(name, delay)
+
+    def remove_job(self, name: str):
+        self._jobs.pop(name, None)
+        task = self._tasks.pop(name, None)
+        if task:
+            task.cancel()
+
+    def jobs(self):
+        return list(self._jobs)
+
+    def _start(self, name: str, initial_delay: float):
+        self._tasks[name] = asyncio.create_task(self._loop(name, initial_delay))
+
+    async def _loop(self, name: str, delay: float):
+        while name in self._jobs:
+            await asyncio.sleep(delay)
+            job = self._jobs.get(name)
+            if job is None:
+                break
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                failures = self._failures.get(name, 0) + 1
+                self._failures[name] = failures
+                delay = self._jittered(min(self.backoff_max, self.backoff_base * 2 ** (failures - 1)))
+                logger.warning("Refresh job %s failed (attempt %d), retrying in %.0fs: %r", name, failures, delay, error)
+            else:
+                self._failures.pop(name, None)
+                delay = self._jittered(self.interval)
+        self._tasks.pop(name, None)
+
+    async def run_once(self, name: str):
+        """Run a job immediately, outside its schedule."""
+        await self._jobs[name]()
+
+    def start(self, lock_path: Optional[str] = None):
+        """
+        Start every registered job, spreading first runs over a few seconds.
+
+        With lock_path, jobs only run in the process holding that file's
+        lock; the others keep retrying it, so one takes over if the holder exits.
+        """
+        if lock_path and not self._try_lock(lock_path):
+            self._lock_task = asyncio.create_task(self._wait_for_lock(lock_path))
+            return
+        self.running = True
+        for name in self._jobs:
+            if name not in self._tasks:
+                self._start(name, random.uniform(0, REFRESH_STARTUP_SPREAD))
+
+    def _try_lock(self, lock_path: str) -> bool:
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # Held until the process exits or stop() closes it
+        self._lock_fd = fd
+        return True
+
+    async def _wait_for_lock(self, lock_path: str):
+        while not self._try_lock(lock_path):
+            await asyncio.sleep(self._jittered(REFRESH_LOCK_RETRY))
+        self._lock_task = None
+        self.start()
+
+    async def stop(self):
+        self.running = False
+        tasks = list(self._tasks.values())
+        if self._lock_task:
+            tasks.append(self._lock_task)
+            self._lock_task = None
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "waiting_for_lock": self._lock_task is not None,
+            "jobs": len(self._jobs),
+            "failing": dict(self._failures),
+        }
+
+snapshots = SnapshotStore(SNAPSHOT_PATH)
+scheduler = RefreshScheduler()
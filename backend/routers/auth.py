@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from pydantic import BaseModel
 from backend.database import get_db
 from backend.models import User
-from backend.auth import authenticate_user, create_access_token, get_password_hash, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from backend.auth import authenticate_user_async, create_access_token, hash_password_async, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
 
 class LoginRequest(BaseModel):
     username: str
@@ -14,8 +15,8 @@ class LoginRequest(BaseModel):
 router = APIRouter()
 
 @router.post("/token")
-def login(form_data: LoginRequest, db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login(form_data: LoginRequest, db: Session = Depends(get_db)):
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,33 +30,40 @@ def login(form_data: LoginRequest, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/register")
-def register(
+async def register(
     username: str,
     email: str,
     password: str,
     full_name: str = None,
     db: Session = Depends(get_db)
 ):
-    # Check if user already exists
-    db_user = db.query(User).filter(User.username == username).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
+    def check_existing():
+        # Check if user already exists
+        db_user = db.query(User).filter(User.username == username).first()
+        if db_user:
+            raise HTTPException(status_code=400, detail="Username already registered")
 
-    db_user = db.query(User).filter(User.email == email).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
+        db_user = db.query(User).filter(User.email == email).first()
+        if db_user:
+            raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Create new user
-    hashed_password = get_password_hash(password)
+    await run_in_threadpool(check_existing)
+
+    # Hash on the dedicated pool, then create the new user
+    hashed_password = await hash_password_async(password)
     db_user = User(
         username=username,
         email=email,
         hashed_password=hashed_password,
         full_name=full_name
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+
+    def save():
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+
+    await run_in_threadpool(save)
 
     return {"message": "User created successfully", "user_id": db_user.id}
 
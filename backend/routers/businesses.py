@@ -1,79 +1,169 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-import requests
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session, contains_eager, load_only, selectinload
+from pydantic import BaseModel
+from typing import List, Optional, Union
+from functools import partial
 import json
+import logging
 import os
-from backend.database import get_db
-from backend.models import Business, BusinessPhoto, User
+import numpy as np
+from backend.database import ReadSession, get_db, get_read_db, read_session
+from backend.models import Business, BusinessPhoto, BusinessRatingSummary, User
 from ..auth import get_current_user
+from ..detail_cache import business_key, detail_cache
+from ..http_cache import DETAIL_CACHE_CONTROL, SNAPSHOT_CACHE_CONTROL, conditional_get
+from ..pagination import decode_cursor, encode_cursor
+from ..ratings import get_ratings
+from ..refresh import scheduler, snapshots
+from ..schemas import (
+    BusinessListAdapter,
+    BusinessListItem,
+    BusinessOut,
+    BusinessPage,
+    BusinessPageAdapter,
+    InstitutionOut,
+    NearbyBusinessOut,
+    RealDataOut,
+    schema_response,
+)
+from ..search import apply_fts_search, fts_enabled
+from ..geokernels import dedupe_by_distance, top_k_indices
+from ..geodata import NOMINATIM_DEADLINE, OVERPASS_DEADLINE, fetch_nominatim, fetch_overpass, gather_sources
+from ..spatial_index import ensure_area, get_index, index_business, load_area
+from ..streaming import ndjson_response, wants_stream
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
-def get_businesses(
-    skip: int = 0,
-    limit: int = 100,
+# Categories mapping
+CATEGORY_MAPPING = {
+    "restaurants": ["restaurant", "food", "cafe"],
+    "cafes": ["cafe", "coffee"],
+    "xerox": ["copyshop", "stationery"],
+    "hostels": ["hostel", "guest_house"],
+    "groceries": ["supermarket", "convenience"],
+    "salons": ["hairdresser", "beauty"],
+    "gyms": ["gym", "fitness"],
+    "electronics": ["electronics", "computer"],
+    "hospitals": ["hospital", "clinic"],
+    "libraries": ["library"],
+    "study_spots": ["library", "cafe", "study"]
+}
+
+# Default to all relevant business types
+DEFAULT_KINDS = {
+    "restaurant", "cafe", "bar", "fast_food",
+    "supermarket", "convenience", "shop",
+    "bank", "atm", "pharmacy", "hospital", "clinic",
+    "school", "college", "library",
+    "clothes", "electronics", "books", "stationery",
+}
+
+BUSINESS_LIST_COLUMNS = (
+    Business.id, Business.name, Business.description, Business.category,
+    Business.address, Business.latitude, Business.longitude, Business.phone,
+    Business.email, Business.website, Business.price_range, Business.operating_hours,
+    Business.is_verified, Business.is_featured,
+)
+
+def _business_list_query(
     category: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    min_rating: Optional[float] = None,
+    ranked: bool = False,
 ):
-    query = db.query(Business)
+    # Load only the response columns, join the rating summary and fetch all
+    # photos in one extra query
+    query = select(Business).outerjoin(Business.rating_summary).options(
+        load_only(*BUSINESS_LIST_COLUMNS),
+        contains_eager(Business.rating_summary),
+        selectinload(Business.photos).load_only(BusinessPhoto.url, BusinessPhoto.is_main),
+    )
 
     if category:
         query = query.filter(Business.category == category)
 
-    if search:
+    if min_rating is not None:
+        query = query.filter(BusinessRatingSummary.average_rating >= min_rating)
+
+    if search and fts_enabled():
+        query = apply_fts_search(query, Business.id, search, ranked=ranked)
+    elif search:
         query = query.filter(Business.name.contains(search) | Business.description.contains(search))
 
-    businesses = query.offset(skip).limit(limit).all()
-
-    result = []
-    for business in businesses:
-        business_dict = {
-            "id": business.id,
-            "name": business.name,
-            "description": business.description,
-            "category": business.category,
-            "address": business.address,
-            "latitude": business.latitude,
-            "longitude": business.longitude,
-            "phone": business.phone,
-            "email": business.email,
-            "website": business.website,
-            "price_range": business.price_range,
-            "operating_hours": business.operating_hours,
-            "is_verified": business.is_verified,
-            "is_featured": business.is_featured,
-            "photos": [{"url": photo.url, "is_main": photo.is_main} for photo in business.photos]
-        }
-        result.append(business_dict)
+    return query
 
-    return result
+def _business_list_item(business: Business) -> BusinessListItem:
+    return BusinessListItem.model_validate(business)
 
-@router.get("/{business_id}")
-def get_business(business_id: int, db: Session = Depends(get_db)):
-    business = db.query(Business).filter(Business.id == business_id).first()
-    if not business:
-        raise HTTPException(status_code=404, detail="Business not found")
+@router.get(
+    "/",
+    response_model=Union[List[BusinessListItem], BusinessPage],
+    dependencies=[conditional_get(("businesses", "business_photos", "business_rating_summaries"))],
+)
+async def get_businesses(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    sort_by: Optional[str] = None,
+    stream: bool = False,
+    db: ReadSession = Depends(get_read_db)
+):
+    """
+    List businesses.
 
-    return {
-        "id": business.id,
-        "name": business.name,
-        "description": business.description,
-        "category": business.category,
-        "address": business.address,
-        "latitude": business.latitude,
-        "longitude": business.longitude,
-        "phone": business.phone,
-        "email": business.email,
-        "website": business.website,
-        "price_range": business.price_range,
-        "operating_hours": business.operating_hours,
-        "is_verified": business.is_verified,
-        "is_featured": business.is_featured,
-        "photos": [{"url": photo.url, "is_main": photo.is_main} for photo in business.photos]
-    }
+    Pages with skip/limit by default. Passing cursor (empty for the first
+    page) switches to keyset pagination on id and returns
+    {"items": [...], "next_cursor": ...} instead of a bare list.
+
+    search uses the FTS5 index when available: every word is matched as a
+    prefix of a word in the name or description, and offset pages are
+    ordered by relevance.
+
+    Ratings come from the precomputed per-business summaries; sort_by=rating
+    orders offset pages by average rating.
+
+    With stream=1 or Accept: application/x-ndjson the same rows are sent as
+    NDJSON, one business per line, without building the page in memory.
+    """
+    sort_by_rating = sort_by == "rating" and cursor is None
+    last_id = decode_cursor(cursor, int)[0] if cursor else None
+
+    # Ranked prefix search; keyset pages stay in id order
+    query = _business_list_query(category, search, min_rating, ranked=cursor is None and not sort_by_rating)
+    if cursor is not None:
+        if last_id is not None:
+            query = query.filter(Business.id > last_id)
+        query = query.order_by(Business.id).limit(limit)
+    else:
+        if sort_by_rating:
+            query = query.order_by(BusinessRatingSummary.average_rating.desc(), Business.id)
+        query = query.offset(skip).limit(limit)
+
+    if wants_stream(request, stream):
+        return ndjson_response(query, _business_list_item)
+
+    businesses = (await db.execute(query)).scalars().all()
+
+    if cursor is not None:
+        next_cursor = encode_cursor(businesses[-1].id) if businesses and len(businesses) == limit else None
+        return schema_response(BusinessPageAdapter, {"items": businesses, "next_cursor": next_cursor})
+    return schema_response(BusinessListAdapter, businesses)
+
+@router.get("/export")
+def export_businesses(category: Optional[str] = None):
+    """Stream every business, in id order, as NDJSON."""
+    return ndjson_response(
+        _business_list_query(category).order_by(Business.id),
+        _business_list_item,
+        **{"Content-Disposition": 'attachment; filename="businesses.ndjson"'},
+    )
 
 @router.post("/")
 def create_business(
@@ -108,8 +198,88 @@ def create_business(
     db.add(business)
     db.commit()
     db.refresh(business)
+    index_business(business)
     return {"message": "Business created successfully", "id": business.id}
 
+MAX_BATCH_SIZE = 1000
+BUSINESS_REQUIRED_FIELDS = ("name", "description", "category", "address", "latitude", "longitude")
+
+class BusinessBatchItem(BaseModel):
+    id: Optional[int] = None  # set to update an existing business
+    name: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    website: Optional[str] = None
+    price_range: Optional[str] = None
+    operating_hours: Optional[str] = None
+
+@router.post("/batch")
+def batch_upsert_businesses(
+    items: List[BusinessBatchItem],
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create or update many businesses in one transaction.
+
+    Items with an id update that business, items without one are created.
+    Every item is validated first; if any fails nothing is written and the
+    per-item errors are returned with a 422.
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} items per batch")
+
+    update_ids = [item.id for item in items if item.id is not None]
+    owners = dict(db.query(Business.id, Business.owner_id).filter(Business.id.in_(update_ids))) if update_ids else {}
+
+    errors = []
+    seen_ids = set()
+    for i, item in enumerate(items):
+        if item.id is None:
+            missing = [field for field in BUSINESS_REQUIRED_FIELDS if getattr(item, field) is None]
+            if missing:
+                errors.append({"index": i, "error": f"Missing required fields: {', '.join(missing)}"})
+        elif item.id in seen_ids:
+            errors.append({"index": i, "error": "Business appears more than once in the batch"})
+        elif item.id not in owners:
+            errors.append({"index": i, "error": "Business not found"})
+        elif owners[item.id] != current_user.id:
+            errors.append({"index": i, "error": "Not authorized to update this business"})
+        if item.id is not None:
+            seen_ids.add(item.id)
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": "Batch rejected", "errors": errors})
+
+    creates, updates, results = [], [], []
+    for i, item in enumerate(items):
+        if item.id is None:
+            mapping = item.model_dump(exclude={"id"})
+            mapping["owner_id"] = current_user.id
+            creates.append(mapping)
+            results.append({"index": i, "status": "created"})
+        else:
+            updates.append(item.model_dump(exclude_none=True))
+            results.append({"index": i, "status": "updated", "id": item.id})
+
+    db.bulk_insert_mappings(Business, creates, return_defaults=True)
+    db.bulk_update_mappings(Business, updates)
+    db.commit()
+
+    created_ids = iter(mapping["id"] for mapping in creates)
+    for result in results:
+        if result["status"] == "created":
+            result["id"] = next(created_ids)
+
+    for business in db.query(Business).filter(Business.id.in_([result["id"] for result in results])):
+        index_business(business)
+
+    return {"created": len(creates), "updated": len(updates), "results": results}
+
 @router.put("/{business_id}")
 def update_business(
     business_id: int,
@@ -151,234 +321,288 @@ def update_business(
         setattr(business, field, value)
 
     db.commit()
+    index_business(business)
     return {"message": "Business updated successfully"}
 
-@router.get("/institutions")
-def get_institutions():
+REAL_DATA_RADIUS = 3000
+NEARBY_LIMIT = 50
+# Same-named institutions closer than this are one place listed twice
+INSTITUTION_DEDUP_RADIUS_M = 200
+
+async def load_institutions() -> List[dict]:
     """
     Fetch real institutions (colleges/schools) in Coimbatore from multiple sources
     """
-    try:
-        institutions = []
-
-        # 1. OpenStreetMap Overpass API
-        overpass_url = "https://overpass-api.de/api/interpreter"
-        overpass_query = """
-        [out:json][timeout:25];
-        area["name"="Coimbatore"]["admin_level"="6"];
-        (
-          node["amenity"="school"](area);
-          node["amenity"="college"](area);
-          node["amenity"="university"](area);
-          way["amenity"="school"](area);
-          way["amenity"="college"](area);
-          way["amenity"="university"](area);
-        );
-        out center;
-        """
-        response = requests.post(overpass_url, data={"data": overpass_query}, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-
-        for element in data.get("elements", []):
-            if "tags" in element:
-                name = element["tags"].get("name", "")
-                if name and len(name) > 3:  # Filter out very short names
-                    lat = element.get("lat", element.get("center", {}).get("lat", 0))
-                    lon = element.get("lon", element.get("center", {}).get("lon", 0))
-                    if lat and lon:
-                        institutions.append({
-                            "name": name,
-                            "type": "college" if "college" in element["tags"].get("amenity", "").lower() or "university" in element["tags"].get("amenity", "").lower() else "school",
-                            "address": element["tags"].get("addr:full", element["tags"].get("addr:street", "Coimbatore, Tamil Nadu")),
-                            "latitude": float(lat),
-                            "longitude": float(lon),
-                            "place_id": f"osm_{element['id']}"
-                        })
-
-        # 2. Nominatim API as fallback/supplement
-        if len(institutions) < 20:
-            nominatim_url = "https://nominatim.openstreetmap.org/search"
-            params = {
-                "q": "college OR school OR university in Coimbatore Tamil Nadu India",
-                "format": "json",
-                "limit": 50,
-                "countrycodes": "IN"
-            }
-            response = requests.get(nominatim_url, params=params, headers={"User-Agent": "LocalBusinessDirectory/1.0"})
-            response.raise_for_status()
-
-            existing_names = {inst["name"].lower() for inst in institutions}
-            for item in response.json():
-                name = item.get("display_name", "").split(",")[0]
-                if name and name.lower() not in existing_names and len(name) > 3:
+    institutions = []
+
+    # 1. OpenStreetMap Overpass API
+    overpass_query = """
+    [out:json][timeout:25];
+    area["name"="Coimbatore"]["admin_level"="6"];
+    (
+      node["amenity"="school"](area);
+      node["amenity"="college"](area);
+      node["amenity"="university"](area);
+      way["amenity"="school"](area);
+      way["amenity"="college"](area);
+      way["amenity"="university"](area);
+    );
+    out center;
+    """
+
+    # 2. Nominatim API as fallback/supplement, fetched concurrently
+    params = {
+        "q": "college OR school OR university in Coimbatore Tamil Nadu India",
+        "format": "json",
+        "limit": 50,
+        "countrycodes": "IN"
+    }
+
+    results, errors = await gather_sources({
+        "overpass": (fetch_overpass(overpass_query), OVERPASS_DEADLINE),
+        "nominatim": (fetch_nominatim(params), NOMINATIM_DEADLINE),
+    })
+    if not results:
+        raise errors["overpass"]
+
+    for element in results.get("overpass", {}).get("elements", []):
+        if "tags" in element:
+            name = element["tags"].get("name", "")
+            if name and len(name) > 3:  # Filter out very short names
+                lat = element.get("lat", element.get("center", {}).get("lat", 0))
+                lon = element.get("lon", element.get("center", {}).get("lon", 0))
+                if lat and lon:
                     institutions.append({
                         "name": name,
-                        "type": "college" if "college" in item.get("display_name", "").lower() else "school",
-                        "address": item.get("display_name", ""),
-                        "latitude": float(item.get("lat", 0)),
-                        "longitude": float(item.get("lon", 0)),
-                        "place_id": f"nominatim_{item.get('place_id')}"
+                        "type": "college" if "college" in element["tags"].get("amenity", "").lower() or "university" in element["tags"].get("amenity", "").lower() else "school",
+                        "address": element["tags"].get("addr:full", element["tags"].get("addr:street", "Coimbatore, Tamil Nadu")),
+                        "latitude": float(lat),
+                        "longitude": float(lon),
+                        "place_id": f"osm_{element['id']}"
                     })
 
-        # Deduplicate
-        seen = set()
-        deduplicated = []
-        for inst in institutions:
-            key = (inst["name"].lower(), round(inst["latitude"], 4), round(inst["longitude"], 4))
-            if key not in seen:
-                seen.add(key)
-                deduplicated.append(inst)
+    if len(institutions) < 20:
+        existing_names = {inst["name"].lower() for inst in institutions}
+        for item in results.get("nominatim", []):
+            name = item.get("display_name", "").split(",")[0]
+            if name and name.lower() not in existing_names and len(name) > 3:
+                institutions.append({
+                    "name": name,
+                    "type": "college" if "college" in item.get("display_name", "").lower() else "school",
+                    "address": item.get("display_name", ""),
+                    "latitude": float(item.get("lat", 0)),
+                    "longitude": float(item.get("lon", 0)),
+                    "place_id": f"nominatim_{item.get('place_id')}"
+                })
+
+    # Deduplicate, e.g. a campus mapped both as a node and as a way
+    keep = dedupe_by_distance(
+        [inst["name"] for inst in institutions],
+        [inst["latitude"] for inst in institutions],
+        [inst["longitude"] for inst in institutions],
+        INSTITUTION_DEDUP_RADIUS_M,
+    )
+    return [institutions[i] for i in keep[:50]]  # Limit to 50 institutions
 
-        return deduplicated[:50]  # Limit to 50 institutions
+async def find_nearby_businesses(
+    db: ReadSession,
+    lat: float,
+    lon: float,
+    radius: int = REAL_DATA_RADIUS,
+    category: Optional[str] = None,
+    sort_by: str = "distance",
+    min_rating: Optional[float] = None
+) -> List[dict]:
+    """
+    Return nearby businesses within radius from the local spatial index
+    """
+    google_params = None
+    google_api_key = os.getenv("GOOGLE_PLACES_API_KEY")
+    if google_api_key:
+        google_params = {
+            "lat": lat,
+            "lon": lon,
+            "radius": radius,
+            "place_type": category or "restaurant",
+            "api_key": google_api_key
+        }
 
+    index = await ensure_area(lat, lon, radius, google_params)
+
+    if category and category in CATEGORY_MAPPING:
+        kinds = set(CATEGORY_MAPPING[category])
+    else:
+        kinds = DEFAULT_KINDS
+
+    matches = []
+    for distance_m, entry in index.query(lat, lon, radius):
+        if entry["source"] == "osm":
+            if entry["kind"] not in kinds:
+                continue
+        elif category and entry["kind"] != category and entry["kind"] not in kinds:
+            continue
+        matches.append((distance_m, entry))
+
+    # Directory businesses are rated from their precomputed review summaries
+    business_ids = {entry["business_id"] for _, entry in matches if entry.get("business_id")}
+    ratings = await get_ratings(db, business_ids)
+
+    candidates = []
+    google_candidates = []
+    for distance_m, entry in matches:
+        rating = entry["rating"]
+        if entry.get("business_id") in ratings and ratings[entry["business_id"]][1]:
+            rating = ratings[entry["business_id"]][0]
+        if rating is None:
+            rating = 4.0  # Default rating for places without reviews
+        if min_rating is not None and rating < min_rating:
+            continue
+        if entry["source"] == "google":
+            google_candidates.append((distance_m, rating, entry))
+        else:
+            candidates.append((distance_m, rating, entry))
+
+    # Google Places only supplements names we don't already have
+    existing_names = {entry["name"].lower() for _, _, entry in candidates}
+    candidates.extend(c for c in google_candidates if c[2]["name"].lower() not in existing_names)
+
+    # Pick the page with a partial selection instead of sorting every candidate
+    distances = np.fromiter((c[0] for c in candidates), float, len(candidates))
+    if sort_by == "distance":
+        page = top_k_indices(distances, NEARBY_LIMIT)
+    elif sort_by == "rating":
+        ratings_desc = np.fromiter((-c[1] for c in candidates), float, len(candidates))
+        page = top_k_indices(ratings_desc, NEARBY_LIMIT, tiebreak=distances)
+    else:
+        page = range(min(len(candidates), NEARBY_LIMIT))
+
+    businesses = []
+    for i in page:
+        distance_m, rating, entry = candidates[i]
+        businesses.append({
+            "business_name": entry["name"],
+            "category": category or entry["kind"],
+            "rating": rating,
+            "address": entry["address"] or f"Coimbatore, {distance_m:.0f}m away",
+            "distance_m": int(distance_m),
+            "lat": entry["lat"],
+            "lng": entry["lon"],
+            "opening_hours": entry["opening_hours"],
+            "place_id": entry["place_id"]
+        })
+    return businesses
+
+def _nearby_key(lat: float, lon: float) -> str:
+    return f"nearby:{lat:.5f},{lon:.5f}"
+
+async def refresh_nearby(lat: float, lon: float):
+    key = _nearby_key(lat, lon)
+    # Unlike a request, the job can wait for upstream tiles
+    await load_area(lat, lon, REAL_DATA_RADIUS)
+    async with read_session() as db:
+        businesses = await find_nearby_businesses(db, lat, lon)
+
+    # Keep the last good snapshot unless upstream data actually arrived
+    index = get_index()
+    if snapshots.get(key) is not None and not index.tiles_loaded(index.tiles_for(lat, lon, REAL_DATA_RADIUS)):
+        raise RuntimeError(f"Upstream data unavailable around {lat}, {lon}")
+    snapshots.set(key, businesses)
+
+async def refresh_institutions():
+    """Refresh the institution list and keep one nearby job per institution."""
+    institutions = await load_institutions()
+    snapshots.set("institutions", institutions)
+
+    wanted = {}
+    for inst in institutions:
+        wanted[_nearby_key(inst["latitude"], inst["longitude"])] = (inst["latitude"], inst["longitude"])
+    for name in scheduler.jobs():
+        if name.startswith("nearby:") and name not in wanted:
+            scheduler.remove_job(name)
+    for name, (lat, lon) in wanted.items():
+        if name not in scheduler.jobs():
+            scheduler.add_job(name, partial(refresh_nearby, lat, lon), run_now=True)
+    return institutions
+
+def register_refresh_jobs():
+    """Schedule the institution refresh; it registers the nearby jobs itself."""
+    scheduler.add_job("institutions", refresh_institutions)
+    for inst in snapshots.get("institutions") or []:
+        scheduler.add_job(
+            _nearby_key(inst["latitude"], inst["longitude"]),
+            partial(refresh_nearby, inst["latitude"], inst["longitude"]),
+        )
+
+async def warm_snapshots():
+    """
+    Fill the institution snapshot and the default nearby page around each
+    institution, e.g. once before forking workers so none starts cold.
+    """
+    try:
+        institutions = await refresh_institutions()
+    except Exception as e:
+        logger.warning("Snapshot warmup skipped, institutions unavailable: %r", e)
+        return
+    for inst in institutions:
+        try:
+            await refresh_nearby(inst["latitude"], inst["longitude"])
+        except Exception as e:
+            logger.warning("Snapshot warmup failed around %s: %r", inst["name"], e)
+
+@router.get(
+    "/institutions",
+    response_model=List[InstitutionOut],
+    dependencies=[conditional_get(snapshot_keys=("institutions",), cache_control=SNAPSHOT_CACHE_CONTROL)],
+)
+async def get_institutions():
+    """
+    Return institutions from the last good refresh, fetching them on a cold start
+    """
+    institutions = snapshots.get("institutions")
+    if institutions is not None:
+        return institutions
+    try:
+        return await refresh_institutions()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch institutions: {str(e)}")
 
-@router.get("/nearby-businesses")
-def get_nearby_businesses(
+@router.get("/nearby-businesses", response_model=List[NearbyBusinessOut])
+async def get_nearby_businesses(
     lat: float,
     lon: float,
-    radius: int = 3000,
+    radius: int = REAL_DATA_RADIUS,
     category: Optional[str] = None,
-    sort_by: str = "distance"
+    sort_by: str = "distance",
+    min_rating: Optional[float] = None,
+    db: ReadSession = Depends(get_read_db)
 ):
     """
-    Fetch real nearby businesses within radius from multiple sources
+    Return nearby businesses within radius from the local spatial index
     """
+    # Default queries around a known institution are kept fresh in the background
+    if radius == REAL_DATA_RADIUS and category is None and sort_by == "distance" and min_rating is None:
+        businesses = snapshots.get(_nearby_key(lat, lon))
+        if businesses is not None:
+            return businesses
     try:
-        businesses = []
-
-        # Categories mapping
-        category_mapping = {
-            "restaurants": ["restaurant", "food", "cafe"],
-            "cafes": ["cafe", "coffee"],
-            "xerox": ["copyshop", "stationery"],
-            "hostels": ["hostel", "guest_house"],
-            "groceries": ["supermarket", "convenience"],
-            "salons": ["hairdresser", "beauty"],
-            "gyms": ["gym", "fitness"],
-            "electronics": ["electronics", "computer"],
-            "hospitals": ["hospital", "clinic"],
-            "libraries": ["library"],
-            "study_spots": ["library", "cafe", "study"]
-        }
-
-        # 1. OpenStreetMap Overpass API
-        overpass_url = "https://overpass-api.de/api/interpreter"
-
-        # Build query based on category
-        if category and category in category_mapping:
-            amenities = category_mapping[category]
-            amenity_conditions = " OR ".join([f'["amenity"="{amenity}"]' for amenity in amenities])
-        else:
-            # Default to all relevant business types
-            amenity_conditions = '''
-            ["amenity"~"restaurant|cafe|bar|fast_food"]
-            ["amenity"~"supermarket|convenience|shop"]
-            ["amenity"~"bank|atm|pharmacy|hospital|clinic"]
-            ["amenity"~"school|college|library"]
-            ["shop"~"clothes|electronics|books|stationery"]
-            '''
-
-        overpass_query = f"""
-        [out:json][timeout:25];
-        (
-          node{amenity_conditions}(around:{radius},{lat},{lon});
-          way{amenity_conditions}(around:{radius},{lat},{lon});
-        );
-        out center;
-        """
-
-        response = requests.post(overpass_url, data={"data": overpass_query}, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-
-        for element in data.get("elements", []):
-            if "tags" in element:
-                name = element["tags"].get("name", "")
-                if name and len(name) > 2:
-                    lat_biz = element.get("lat", element.get("center", {}).get("lat", 0))
-                    lon_biz = element.get("lon", element.get("center", {}).get("lon", 0))
-
-                    if lat_biz and lon_biz:
-                        # Calculate distance (rough approximation)
-                        from math import radians, sin, cos, sqrt, atan2
-                        R = 6371  # Earth's radius in km
-                        dlat = radians(float(lat_biz) - lat)
-                        dlon = radians(float(lon_biz) - lon)
-                        a = sin(dlat/2)**2 + cos(radians(lat)) * cos(radians(float(lat_biz))) * sin(dlon/2)**2
-                        c = 2 * atan2(sqrt(a), sqrt(1-a))
-                        distance_m = R * c * 1000
-
-                        if distance_m <= radius:
-                            businesses.append({
-                                "business_name": name,
-                                "category": category or element["tags"].get("amenity", element["tags"].get("shop", "business")),
-                                "rating": 4.0,  # Default rating since OSM doesn't provide
-                                "address": element["tags"].get("addr:full", element["tags"].get("addr:street", f"Coimbatore, {distance_m:.0f}m away")),
-                                "distance_m": int(distance_m),
-                                "lat": float(lat_biz),
-                                "lng": float(lon_biz),
-                                "opening_hours": element["tags"].get("opening_hours", "Not specified"),
-                                "place_id": f"osm_{element['id']}"
-                            })
-
-        # 2. Google Places API (if API key available)
-        google_api_key = os.getenv("GOOGLE_PLACES_API_KEY")
-        if google_api_key and len(businesses) < 20:
-            places_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-            params = {
-                "location": f"{lat},{lon}",
-                "radius": radius,
-                "type": category or "restaurant",
-                "key": google_api_key
-            }
-            response = requests.get(places_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            existing_names = {biz["business_name"].lower() for biz in businesses}
-            for place in data.get("results", []):
-                name = place.get("name", "")
-                if name and name.lower() not in existing_names:
-                    businesses.append({
-                        "business_name": name,
-                        "category": category or place.get("types", ["business"])[0],
-                        "rating": place.get("rating", 0),
-                        "address": place.get("vicinity", "Coimbatore"),
-                        "distance_m": 0,  # Google doesn't provide exact distance in nearby search
-                        "lat": place["geometry"]["location"]["lat"],
-                        "lng": place["geometry"]["location"]["lng"],
-                        "opening_hours": "Check Google Maps",
-                        "place_id": place.get("place_id", "")
-                    })
-
-        # Sort businesses
-        if sort_by == "distance":
-            businesses.sort(key=lambda x: x["distance_m"])
-        elif sort_by == "rating":
-            businesses.sort(key=lambda x: x["rating"], reverse=True)
-
-        return businesses[:50]  # Limit to 50 businesses
-
+        return await find_nearby_businesses(db, lat, lon, radius, category, sort_by, min_rating)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch nearby businesses: {str(e)}")
 
-@router.get("/real-data")
-def get_real_data():
+@router.get("/real-data", response_model=RealDataOut, response_model_exclude_unset=True)
+async def get_real_data(db: ReadSession = Depends(get_read_db)):
     """
     Return clean structured JSON with institutions and sample nearby businesses
     """
     try:
-        institutions = get_institutions()
+        institutions = await get_institutions()
         # Get sample businesses around first institution
         if institutions:
             first_inst = institutions[0]
-            businesses = get_nearby_businesses(
+            businesses = await get_nearby_businesses(
                 lat=first_inst["latitude"],
                 lon=first_inst["longitude"],
-                radius=3000
+                db=db
             )
         else:
             businesses = []
@@ -395,3 +619,24 @@ def get_real_data():
             "status": "error",
             "message": str(e)
         }
+
+# Declared after the static GET routes so they aren't captured by {business_id}
+@router.get(
+    "/{business_id}",
+    response_model=BusinessOut,
+    dependencies=[conditional_get(("businesses", "business_photos"), cache_control=DETAIL_CACHE_CONTROL)],
+)
+async def get_business(business_id: int, request: Request, db: ReadSession = Depends(get_read_db)):
+    """Business details, served from the detail cache when possible."""
+    key = business_key(business_id, request.state.table_versions)
+    body = await detail_cache.get(key)
+    if body is None:
+        business = (await db.execute(
+            select(Business).options(selectinload(Business.photos)).where(Business.id == business_id)
+        )).scalar_one_or_none()
+        if not business:
+            raise HTTPException(status_code=404, detail="Business not found")
+        body = BusinessOut.model_validate(business).model_dump_json().encode()
+        await detail_cache.set(key, body)
+
+    return Response(content=body, media_type="application/json")
@@ -1,52 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-from backend.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Union
+from datetime import date, datetime, timedelta, timezone
+from pydantic import BaseModel
+from backend.database import ReadSession, get_db, get_read_db
 from backend.models import Event, Business, User
 from backend.auth import get_current_user
+from backend.detail_cache import detail_cache, event_key
+from backend.event_calendar import (
+    CALENDAR_VIEWS, WINDOW_MODES, calendar_query, calendar_range, filter_near, filter_overlapping, window_for_mode,
+)
+from backend.http_cache import DETAIL_CACHE_CONTROL, conditional_get
+from backend.pagination import decode_cursor, encode_cursor
+from backend.schemas import EventCalendar, EventOut, EventPage
+from backend.streaming import ndjson_response, wants_stream
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
-def get_events(
-    skip: int = 0,
-    limit: int = 100,
-    upcoming: bool = True,
-    db: Session = Depends(get_db)
-):
-    query = db.query(Event)
-    
-    if upcoming:
-        query = query.filter(Event.start_date >= datetime.utcnow())
-    
-    query = query.order_by(Event.start_date)
-    events = query.offset(skip).limit(limit).all()
-    
-    result = []
-    for event in events:
-        event_dict = {
-            "id": event.id,
-            "title": event.title,
-            "description": event.description,
-            "start_date": event.start_date,
-            "end_date": event.end_date,
-            "location": event.location,
-            "business": {
-                "id": event.business.id,
-                "name": event.business.name
-            } if event.business else None
-        }
-        result.append(event_dict)
-    
-    return result
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Event times are stored as naive UTC; convert aware input to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
-@router.get("/{event_id}")
-def get_event(event_id: int, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
+def _event_list_query():
+    # Project the response columns and join the business name in one query
+    return select(
+        Event.id,
+        Event.title,
+        Event.description,
+        Event.start_date,
+        Event.end_date,
+        Event.location,
+        Business.id.label("business_id"),
+        Business.name.label("business_name"),
+    ).select_from(Event).outerjoin(Business, Event.business_id == Business.id)
+
+def _event_list_item(event) -> dict:
+    # Plain dicts shaped like EventOut: the projected columns already have
+    # the schema's types, so listings skip validation and go straight to orjson
     return {
         "id": event.id,
         "title": event.title,
@@ -55,11 +49,152 @@ def get_event(event_id: int, db: Session = Depends(get_db)):
         "end_date": event.end_date,
         "location": event.location,
         "business": {
-            "id": event.business.id,
-            "name": event.business.name
-        } if event.business else None
+            "id": event.business_id,
+            "name": event.business_name
+        } if event.business_id is not None else None
     }
 
+# upcoming filters on the clock, so validators also roll over every minute
+@router.get(
+    "/",
+    response_model=Union[List[EventOut], EventPage],
+    dependencies=[conditional_get(("events", "businesses"), time_bucket=60)],
+)
+async def get_events(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    upcoming: bool = True,
+    mode: Optional[str] = None,
+    active_from: Optional[datetime] = None,
+    active_to: Optional[datetime] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius: int = 5000,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: ReadSession = Depends(get_read_db)
+):
+    """
+    List events ordered by start date.
+
+    By default only events that haven't started yet are listed. mode
+    (now, today, week or weekend) or active_from/active_to instead select
+    the events that are on at any point in that window, including ones
+    already in progress. With lat and lon, only events at businesses within
+    radius meters are included.
+
+    Pages with skip/limit by default. Passing cursor (empty for the first
+    page) switches to keyset pagination on (start_date, id) and returns
+    {"items": [...], "next_cursor": ...} instead of a bare list.
+
+    With stream=1 or Accept: application/x-ndjson the same rows are sent as
+    NDJSON, one event per line.
+    """
+    now = datetime.utcnow()
+    last_key = decode_cursor(cursor, datetime, int) if cursor else None
+
+    window = None
+    if mode is not None:
+        if mode not in WINDOW_MODES:
+            raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(WINDOW_MODES)}")
+        if active_from or active_to:
+            raise HTTPException(status_code=400, detail="Pass either mode or active_from/active_to, not both")
+        window = window_for_mode(mode, now)
+    elif active_from or active_to:
+        active_from, active_to = _naive_utc(active_from), _naive_utc(active_to)
+        window = (active_from or now, active_to or active_from or now)
+        if window[0] > window[1]:
+            raise HTTPException(status_code=400, detail="active_from must not be after active_to")
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=400, detail="lat and lon must be given together")
+
+    query = _event_list_query()
+    if window is not None:
+        query = filter_overlapping(query, *window)
+    elif upcoming:
+        query = query.filter(Event.start_date >= now)
+    if lat is not None:
+        query = filter_near(query, lat, lon, radius)
+    if cursor is not None:
+        if last_key:
+            query = query.filter(tuple_(Event.start_date, Event.id) > tuple(last_key))
+        query = query.order_by(Event.start_date, Event.id).limit(limit)
+    else:
+        query = query.order_by(Event.start_date).offset(skip).limit(limit)
+
+    if wants_stream(request, stream):
+        return ndjson_response(query, _event_list_item)
+
+    events = (await db.execute(query)).all()
+    result = [_event_list_item(event) for event in events]
+    
+    if cursor is not None:
+        next_cursor = None
+        if events and len(events) == limit:
+            next_cursor = encode_cursor(events[-1].start_date, events[-1].id)
+        return ORJSONResponse({"items": result, "next_cursor": next_cursor})
+    return ORJSONResponse(result)
+
+@router.get("/export")
+def export_events():
+    """Stream every event, in start date order, as NDJSON."""
+    return ndjson_response(
+        _event_list_query().order_by(Event.start_date, Event.id),
+        _event_list_item,
+        **{"Content-Disposition": 'attachment; filename="events.ndjson"'},
+    )
+
+@router.get(
+    "/calendar",
+    response_model=EventCalendar,
+    # the default day follows the clock
+    dependencies=[conditional_get(("events", "businesses"), time_bucket=60)],
+)
+async def get_event_calendar(
+    view: str = "week", day: Optional[date] = None, db: ReadSession = Depends(get_read_db)
+):
+    """
+    Events per day for the week (Monday to Sunday) or month containing day.
+
+    Every day of the range is listed, with events spanning several days
+    repeated on each of them. day defaults to today.
+    """
+    if view not in CALENDAR_VIEWS:
+        raise HTTPException(status_code=400, detail=f"view must be one of: {', '.join(CALENDAR_VIEWS)}")
+    first, last = calendar_range(view, day or datetime.utcnow().date())
+
+    days = {first + timedelta(days=i): [] for i in range((last - first).days + 1)}
+    for row in await db.execute(calendar_query(first, last)):
+        days[row.day].append(_event_list_item(row))
+
+    return ORJSONResponse({
+        "view": view,
+        "start": first,
+        "end": last,
+        "days": [{"date": calendar_day, "events": events} for calendar_day, events in days.items()],
+    })
+
+@router.get(
+    "/{event_id}",
+    response_model=EventOut,
+    dependencies=[conditional_get(("events", "businesses"), cache_control=DETAIL_CACHE_CONTROL)],
+)
+async def get_event(event_id: int, request: Request, db: ReadSession = Depends(get_read_db)):
+    """Event details, served from the detail cache when possible."""
+    key = event_key(event_id, request.state.table_versions)
+    body = await detail_cache.get(key)
+    if body is None:
+        event = (await db.execute(
+            select(Event).options(selectinload(Event.business)).where(Event.id == event_id)
+        )).scalar_one_or_none()
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        body = EventOut.model_validate(event).model_dump_json().encode()
+        await detail_cache.set(key, body)
+
+    return Response(content=body, media_type="application/json")
+
 @router.post("/")
 def create_event(
     title: str,
@@ -92,6 +227,89 @@ def create_event(
     db.refresh(event)
     return {"message": "Event created successfully", "id": event.id}
 
+MAX_BATCH_SIZE = 1000
+EVENT_REQUIRED_FIELDS = ("title", "description", "start_date", "end_date", "location")
+
+class EventBatchItem(BaseModel):
+    id: Optional[int] = None  # set to update an existing event
+    title: Optional[str] = None
+    description: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    location: Optional[str] = None
+    business_id: Optional[int] = None
+
+@router.post("/batch")
+def batch_upsert_events(
+    items: List[EventBatchItem],
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create or update many events in one transaction.
+
+    Items with an id update that event, items without one are created.
+    Every item is validated first; if any fails nothing is written and the
+    per-item errors are returned with a 422.
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} items per batch")
+
+    # Owners of every business the batch touches, directly or via an event
+    update_ids = [item.id for item in items if item.id is not None]
+    event_businesses = dict(
+        db.query(Event.id, Event.business_id).filter(Event.id.in_(update_ids))
+    ) if update_ids else {}
+    business_ids = {item.business_id for item in items if item.business_id}
+    business_ids.update(business_id for business_id in event_businesses.values() if business_id)
+    owners = dict(
+        db.query(Business.id, Business.owner_id).filter(Business.id.in_(business_ids))
+    ) if business_ids else {}
+
+    errors = []
+    seen_ids = set()
+    for i, item in enumerate(items):
+        if item.id is None:
+            missing = [field for field in EVENT_REQUIRED_FIELDS if getattr(item, field) is None]
+            if missing:
+                errors.append({"index": i, "error": f"Missing required fields: {', '.join(missing)}"})
+            elif item.business_id and item.business_id not in owners:
+                errors.append({"index": i, "error": "Business not found"})
+            elif item.business_id and owners[item.business_id] != current_user.id:
+                errors.append({"index": i, "error": "Not authorized to create events for this business"})
+        elif item.id in seen_ids:
+            errors.append({"index": i, "error": "Event appears more than once in the batch"})
+        elif item.id not in event_businesses:
+            errors.append({"index": i, "error": "Event not found"})
+        elif item.business_id is not None and item.business_id != event_businesses[item.id]:
+            errors.append({"index": i, "error": "An event's business cannot be changed"})
+        elif event_businesses[item.id] in owners and owners[event_businesses[item.id]] != current_user.id:
+            errors.append({"index": i, "error": "Not authorized to update this event"})
+        if item.id is not None:
+            seen_ids.add(item.id)
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": "Batch rejected", "errors": errors})
+
+    creates, updates, results = [], [], []
+    for i, item in enumerate(items):
+        if item.id is None:
+            creates.append(item.model_dump(exclude={"id"}))
+            results.append({"index": i, "status": "created"})
+        else:
+            updates.append(item.model_dump(exclude={"business_id"}, exclude_none=True))
+            results.append({"index": i, "status": "updated", "id": item.id})
+
+    db.bulk_insert_mappings(Event, creates, return_defaults=True)
+    db.bulk_update_mappings(Event, updates)
+    db.commit()
+
+    created_ids = iter(mapping["id"] for mapping in creates)
+    for result in results:
+        if result["status"] == "created":
+            result["id"] = next(created_ids)
+
+    return {"created": len(creates), "updated": len(updates), "results": results}
+
 @router.put("/{event_id}")
 def update_event(
     event_id: int,
@@ -0,0 +1,111 @@
+"""
+Response models for the public read endpoints.
+
+Models validate straight from ORM objects (from_attributes). The business
+listing renders through schema_response, which validates and encodes a
+whole page in pydantic-core; other routes declare them as response_model
+and go through FastAPI's ORJSONResponse default.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import Response
+from pydantic import AliasPath, BaseModel, ConfigDict, Field, TypeAdapter
+
+class ORMModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+class PhotoOut(ORMModel):
+    url: Optional[str] = None
+    is_main: Optional[bool] = None
+
+class BusinessOut(ORMModel):
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    website: Optional[str] = None
+    price_range: Optional[str] = None
+    operating_hours: Optional[str] = None
+    is_verified: Optional[bool] = None
+    is_featured: Optional[bool] = None
+    photos: List[PhotoOut] = []
+
+class BusinessListItem(BusinessOut):
+    # Read from the precomputed rating summary; absent when it has no reviews
+    rating: Optional[float] = Field(None, validation_alias=AliasPath("rating_summary", "average_rating"))
+    review_count: int = Field(0, validation_alias=AliasPath("rating_summary", "review_count"))
+
+class BusinessPage(BaseModel):
+    items: List[BusinessListItem]
+    next_cursor: Optional[str] = None
+
+class EventBusiness(ORMModel):
+    id: int
+    name: Optional[str] = None
+
+class EventOut(ORMModel):
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    location: Optional[str] = None
+    business: Optional[EventBusiness] = None
+
+class EventPage(BaseModel):
+    items: List[EventOut]
+    next_cursor: Optional[str] = None
+
+class CalendarDay(BaseModel):
+    date: date
+    events: List[EventOut]
+
+class EventCalendar(BaseModel):
+    view: str
+    start: date
+    end: date
+    days: List[CalendarDay]
+
+class InstitutionOut(BaseModel):
+    name: str
+    type: str
+    address: str
+    latitude: float
+    longitude: float
+    place_id: str
+
+class NearbyBusinessOut(BaseModel):
+    business_name: str
+    category: Optional[str] = None
+    rating: float
+    address: str
+    distance_m: int
+    lat: float
+    lng: float
+    opening_hours: Optional[str] = None
+    place_id: str
+
+class RealDataOut(BaseModel):
+    institutions: List[InstitutionOut]
+    nearby_businesses: List[NearbyBusinessOut]
+    status: str
+    message: Optional[str] = None
+
+BusinessListAdapter = TypeAdapter(List[BusinessListItem])
+BusinessPageAdapter = TypeAdapter(BusinessPage)
+
+def schema_response(adapter: TypeAdapter, content) -> Response:
+    """
+    Validate content, ORM rows included, and encode it to JSON in one pass.
+
+    This skips FastAPI's response_model round trip (validate, dump to Python
+    objects, then encode those again), which dominates large listings.
+    """
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, media_type="application/json")
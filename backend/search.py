@@ -0,0 +1,105 @@
+import logging
+import re
+from typing import Optional
+
+from sqlalchemy import false, func, literal_column, table, column
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+# External-content FTS5 index over businesses(name, description), kept in
+# sync by triggers so every write path (ORM, bulk, raw SQL) is covered
+FTS_TABLE_DDL = """
+CREATE VIRTUAL TABLE businesses_fts USING fts5(
+    name, description,
+    content='businesses', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+FTS_TRIGGERS_DDL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS businesses_fts_ai AFTER INSERT ON businesses BEGIN
+        INSERT INTO businesses_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS businesses_fts_ad AFTER DELETE ON businesses BEGIN
+        INSERT INTO businesses_fts(businesses_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS businesses_fts_au AFTER UPDATE OF name, description ON businesses BEGIN
+        INSERT INTO businesses_fts(businesses_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO businesses_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+# Matches in the name weigh more than matches in the description
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+businesses_fts = table("businesses_fts", column("rowid"))
+
+_fts_enabled = False
+
+def ensure_fts_index(engine) -> bool:
+    """
+    Create the FTS5 table and sync triggers if missing.
+
+    A newly created index is backfilled from the businesses table. Returns
+    False, leaving search on the LIKE fallback, when SQLite lacks FTS5.
+    """
+    global _fts_enabled
+    with engine.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'businesses_fts'"
+        ).first()
+        try:
+            if not exists:
+                conn.exec_driver_sql(FTS_TABLE_DDL)
+                conn.exec_driver_sql("INSERT INTO businesses_fts(businesses_fts) VALUES ('rebuild')")
+            for ddl in FTS_TRIGGERS_DDL:
+                conn.exec_driver_sql(ddl)
+        except OperationalError as e:
+            logger.warning("FTS5 unavailable, business search falls back to LIKE: %s", e)
+            _fts_enabled = False
+            return False
+    _fts_enabled = True
+    return True
+
+def fts_enabled() -> bool:
+    return _fts_enabled
+
+def fts_match_expression(text: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query where every word is a prefix match.
+
+    Words are quoted so FTS5 operators in user input are treated literally.
+    Returns None when the text has no searchable words.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+def apply_fts_search(query, id_column, text: str, ranked: bool = True):
+    """
+    Restrict an ORM query to FTS matches, optionally ordered by relevance.
+
+    Text without searchable words matches nothing.
+    """
+    match = fts_match_expression(text)
+    if match is None:
+        return query.filter(false())
+    query = query.join(businesses_fts, businesses_fts.c.rowid == id_column).filter(
+        literal_column("businesses_fts").op("MATCH")(match)
+    )
+    if ranked:
+        query = query.order_by(
+            func.bm25(literal_column("businesses_fts"), NAME_WEIGHT, DESCRIPTION_WEIGHT), id_column
+        )
+    return query
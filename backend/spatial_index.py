@@ -0,0 +1,404 @@
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .database import SessionLocal
+from .geodata import (
+    GOOGLE_PLACES_DEADLINE,
+    OVERPASS_DEADLINE,
+    bbox_places_query,
+    fetch_google_places,
+    fetch_overpass,
+    gather_sources,
+)
+from .geokernels import haversine_m_array
+from .models import Business, TableVersion
+from .osm import element_coordinates, iter_overpass_elements
+from .refresh import RefreshScheduler
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE = 111320
+
+# Query buckets are ~1 km; upstream refreshes happen per ~5.5 km tile
+CELL_DEG = 0.01
+TILE_DEG = 0.05
+TILE_TTL_SECONDS = int(os.getenv("SPATIAL_INDEX_TTL_SECONDS", 6 * 3600))
+TILE_RETRY_SECONDS = 60
+# How often each worker checks the businesses table for writes made elsewhere
+SYNC_INTERVAL = float(os.getenv("SPATIAL_INDEX_SYNC_INTERVAL", 5))
+OSM_SNAPSHOT_PATH = os.getenv(
+    "OSM_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "osm_coimbatore.json"),
+)
+
+def _bbox(lat: float, lon: float, radius_m: float) -> Tuple[float, float, float, float]:
+    dlat = radius_m / METERS_PER_DEGREE
+    dlon = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+class SpatialIndex:
+    """
+    Grid-bucketed index of places, answering radius queries in memory.
+
+    Entries are dicts keyed by "place_id" and bucketed by a fixed-size
+    lat/lon cell; each cell's coordinates are also kept as arrays, rebuilt
+    lazily after writes, so queries measure distances in bulk. Tile
+    bookkeeping records when each coarse tile was last fetched from
+    upstream so callers can decide what needs refreshing.
+    """
+
+    def __init__(self, cell_deg: float = CELL_DEG, tile_deg: float = TILE_DEG):
+        self.cell_deg = cell_deg
+        self.tile_deg = tile_deg
+        self._cells: Dict[Tuple[int, int], Dict[str, dict]] = {}
+        self._cell_arrays: Dict[Tuple[int, int], tuple] = {}
+        self._entries: Dict[str, dict] = {}
+        self._tiles: Dict[Tuple[int, int], dict] = {}
+        self._lock = threading.RLock()
+        # businesses table version the "db" entries were last read at
+        self.businesses_version: Optional[int] = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def upsert(self, entry: dict):
+        with self._lock:
+            self.remove(entry["place_id"])
+            self._entries[entry["place_id"]] = entry
+            cell = self._cell(entry["lat"], entry["lon"])
+            self._cells.setdefault(cell, {})[entry["place_id"]] = entry
+            self._cell_arrays.pop(cell, None)
+
+    def get(self, place_id: str) -> Optional[dict]:
+        return self._entries.get(place_id)
+
+    def place_ids(self, source: str) -> List[str]:
+        with self._lock:
+            return [place_id for place_id, entry in self._entries.items() if entry["source"] == source]
+
+    def remove(self, place_id: str):
+        with self._lock:
+            old = self._entries.pop(place_id, None)
+            if old is None:
+                return
+            cell = self._cell(old["lat"], old["lon"])
+            self._cell_arrays.pop(cell, None)
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.pop(place_id, None)
+                if not bucket:
+                    del self._cells[cell]
+
+    def _arrays(self, cell: Tuple[int, int]) -> tuple:
+        """(entries, lats, lons) for a cell, built on first use after a write."""
+        arrays = self._cell_arrays.get(cell)
+        if arrays is None:
+            entries = list(self._cells[cell].values())
+            arrays = (
+                entries,
+                np.fromiter((entry["lat"] for entry in entries), float, len(entries)),
+                np.fromiter((entry["lon"] for entry in entries), float, len(entries)),
+            )
+            self._cell_arrays[cell] = arrays
+        return arrays
+
+    def query(self, lat: float, lon: float, radius_m: float) -> List[Tuple[float, dict]]:
+        """Return (distance_m, entry) pairs within radius_m of the point."""
+        south, west, north, east = _bbox(lat, lon, radius_m)
+        min_x, min_y = self._cell(south, west)
+        max_x, max_y = self._cell(north, east)
+
+        entries, lats, lons = [], [], []
+        with self._lock:
+            for x in range(min_x, max_x + 1):
+                for y in range(min_y, max_y + 1):
+                    if (x, y) in self._cells:
+                        cell_entries, cell_lats, cell_lons = self._arrays((x, y))
+                        entries.extend(cell_entries)
+                        lats.append(cell_lats)
+                        lons.append(cell_lons)
+        if not entries:
+            return []
+
+        distances = haversine_m_array(lat, lon, np.concatenate(lats), np.concatenate(lons))
+        return [(float(distances[i]), entries[i]) for i in np.flatnonzero(distances <= radius_m)]
+
+    def tiles_for(self, lat: float, lon: float, radius_m: float) -> List[Tuple[int, int]]:
+        south, west, north, east = _bbox(lat, lon, radius_m)
+        return [
+            (x, y)
+            for x in range(math.floor(south / self.tile_deg), math.floor(north / self.tile_deg) + 1)
+            for y in range(math.floor(west / self.tile_deg), math.floor(east / self.tile_deg) + 1)
+        ]
+
+    def tiles_bbox(self, tiles) -> Tuple[float, float, float, float]:
+        """Bounding box (south, west, north, east) covering all given tiles."""
+        xs = [x for x, _ in tiles]
+        ys = [y for _, y in tiles]
+        return (
+            min(xs) * self.tile_deg,
+            min(ys) * self.tile_deg,
+            (max(xs) + 1) * self.tile_deg,
+            (max(ys) + 1) * self.tile_deg,
+        )
+
+    def mark_tiles(self, tiles, loaded: bool, at: Optional[float] = None):
+        now = time.time() if at is None else at
+        with self._lock:
+            for tile in tiles:
+                state = self._tiles.setdefault(tile, {"attempted_at": None, "loaded_at": None})
+                state["attempted_at"] = now
+                if loaded:
+                    state["loaded_at"] = now
+
+    def tiles_loaded(self, tiles) -> bool:
+        """Whether every tile has been fetched from upstream at least once."""
+        with self._lock:
+            return all(self._tiles.get(tile, {}).get("loaded_at") for tile in tiles)
+
+    def tile_status(self, tiles, ttl: int = TILE_TTL_SECONDS):
+        """Split tiles into (never attempted, due for refresh) lists."""
+        now = time.time()
+        missing, stale = [], []
+        with self._lock:
+            for tile in tiles:
+                state = self._tiles.get(tile)
+                if state is None:
+                    missing.append(tile)
+                elif state["loaded_at"] is None:
+                    if now - state["attempted_at"] > TILE_RETRY_SECONDS:
+                        stale.append(tile)
+                elif now - state["loaded_at"] > ttl:
+                    stale.append(tile)
+        return missing, stale
+
+def entry_from_element(element: dict, source: str = "osm") -> Optional[dict]:
+    """Convert an Overpass element into an index entry."""
+    tags = element.get("tags")
+    if not tags:
+        return None
+    name = tags.get("name", "")
+    coords = element_coordinates(element)
+    if not name or len(name) <= 2 or coords is None:
+        return None
+    return {
+        "place_id": f"{source}_{element['id']}",
+        "name": name,
+        "kind": tags.get("amenity", tags.get("shop", "business")),
+        "lat": coords[0],
+        "lon": coords[1],
+        "address": tags.get("addr:full", tags.get("addr:street")),
+        "opening_hours": tags.get("opening_hours", "Not specified"),
+        "rating": None,
+        "source": source,
+    }
+
+def business_place_id(business: Business) -> str:
+    # Imported OSM rows replace the entry for the same element
+    if business.osm_id:
+        return f"osm_{business.osm_id.split('/')[-1]}"
+    return f"db_{business.id}"
+
+def entry_from_business(business: Business) -> Optional[dict]:
+    """Convert a Business row into an index entry."""
+    if business.latitude is None or business.longitude is None:
+        return None
+    return {
+        "place_id": business_place_id(business),
+        "name": business.name,
+        "kind": business.category or "business",
+        "lat": business.latitude,
+        "lon": business.longitude,
+        "address": business.address,
+        "opening_hours": business.operating_hours or "Not specified",
+        "rating": None,
+        "source": "db",
+        "business_id": business.id,
+    }
+
+def entry_from_google_place(place: dict) -> dict:
+    """Convert a Google Places result into an index entry."""
+    location = place["geometry"]["location"]
+    return {
+        "place_id": place.get("place_id") or f"google_{place.get('name', '')}",
+        "name": place.get("name", ""),
+        "kind": place.get("types", ["business"])[0],
+        "lat": location["lat"],
+        "lon": location["lng"],
+        "address": place.get("vicinity", "Coimbatore"),
+        "opening_hours": "Check Google Maps",
+        "rating": place.get("rating", 0),
+        "source": "google",
+    }
+
+_index: Optional[SpatialIndex] = None
+_index_lock = threading.Lock()
+_refreshing = set()
+_background_tasks = set()
+
+def businesses_version(db) -> int:
+    version = db.query(TableVersion.version).filter(TableVersion.table_name == "businesses").scalar()
+    return version or 0
+
+def business_entries(db):
+    """Index entries for every business with coordinates."""
+    for business in db.query(Business).filter(
+        Business.latitude.isnot(None), Business.longitude.isnot(None)
+    ).yield_per(1000):
+        entry = entry_from_business(business)
+        if entry:
+            yield entry
+
+def build_index(db, snapshot_path: Optional[str] = OSM_SNAPSHOT_PATH) -> SpatialIndex:
+    """
+    Build an index from the businesses table and a cached OSM snapshot.
+
+    Tiles holding snapshot entries count as loaded when the file was
+    written, so they're only refreshed from upstream once that is stale.
+    """
+    index = SpatialIndex()
+
+    if snapshot_path and os.path.exists(snapshot_path):
+        covered = set()
+        with open(snapshot_path, encoding="utf-8") as fp:
+            for element in iter_overpass_elements(fp):
+                entry = entry_from_element(element)
+                if entry:
+                    index.upsert(entry)
+                    covered.update(index.tiles_for(entry["lat"], entry["lon"], 0))
+        index.mark_tiles(covered, loaded=True, at=os.path.getmtime(snapshot_path))
+
+    # Read before the rows, so a write racing the build is picked up by the next sync
+    index.businesses_version = businesses_version(db)
+    for entry in business_entries(db):
+        index.upsert(entry)
+
+    return index
+
+def sync_businesses(index: SpatialIndex, db) -> bool:
+    """
+    Bring the index's business entries up to date with the table, including
+    writes made by other processes. Returns whether the table had changed.
+    """
+    version = businesses_version(db)
+    if version == index.businesses_version:
+        return False
+    entries = {entry["place_id"]: entry for entry in business_entries(db)}
+    for place_id in index.place_ids("db"):
+        if place_id not in entries:
+            index.remove(place_id)
+    for place_id, entry in entries.items():
+        # Unchanged entries keep their cell arrays
+        if index.get(place_id) != entry:
+            index.upsert(entry)
+    index.businesses_version = version
+    return True
+
+def get_index() -> SpatialIndex:
+    """Return the process-wide index, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                db = SessionLocal()
+                try:
+                    _index = build_index(db)
+                finally:
+                    db.close()
+    return _index
+
+async def refresh_tiles(index: SpatialIndex, tiles, google_params: Optional[dict] = None):
+    """Fetch tiles from Overpass and, optionally, Google Places into the index."""
+    sources = {
+        "overpass": (fetch_overpass(bbox_places_query(*index.tiles_bbox(tiles))), OVERPASS_DEADLINE),
+    }
+    if google_params:
+        sources["google"] = (fetch_google_places(**google_params), GOOGLE_PLACES_DEADLINE)
+
+    try:
+        results, errors = await gather_sources(sources)
+        for element in results.get("overpass", {}).get("elements", []):
+            entry = entry_from_element(element)
+            if entry:
+                index.upsert(entry)
+        for place in results.get("google", {}).get("results", []):
+            if place.get("name"):
+                index.upsert(entry_from_google_place(place))
+
+        for name, error in errors.items():
+            logger.warning("Spatial index refresh from %s failed for tiles %s: %r", name, tiles, error)
+        index.mark_tiles(tiles, loaded="overpass" in results)
+    finally:
+        with _index_lock:
+            _refreshing.difference_update(tiles)
+
+def schedule_refresh(index: SpatialIndex, tiles, google_params: Optional[dict] = None):
+    """Refresh tiles in the background unless a refresh is already running."""
+    with _index_lock:
+        pending = [tile for tile in tiles if tile not in _refreshing]
+        if not pending:
+            return
+        _refreshing.update(pending)
+    task = asyncio.create_task(refresh_tiles(index, pending, google_params))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def ensure_area(lat: float, lon: float, radius_m: float, google_params: Optional[dict] = None):
+    """
+    Return the index, refreshing the area's tiles in the background.
+
+    Queries never wait on upstream: tiles that have never been fetched are
+    scheduled like stale ones, and the index answers with what it has.
+    """
+    index = _index if _index is not None else await asyncio.to_thread(get_index)
+    missing, stale = index.tile_status(index.tiles_for(lat, lon, radius_m))
+    if missing or stale:
+        schedule_refresh(index, missing + stale, google_params)
+    return index
+
+async def load_area(lat: float, lon: float, radius_m: float, google_params: Optional[dict] = None):
+    """Fetch the area's missing and stale tiles and wait for them, for background jobs."""
+    index = _index if _index is not None else await asyncio.to_thread(get_index)
+    missing, stale = index.tile_status(index.tiles_for(lat, lon, radius_m))
+    with _index_lock:
+        pending = [tile for tile in missing + stale if tile not in _refreshing]
+        _refreshing.update(pending)
+    if pending:
+        await refresh_tiles(index, pending, google_params)
+    return index
+
+def _sync_built_index():
+    db = SessionLocal()
+    try:
+        sync_businesses(_index, db)
+    finally:
+        db.close()
+
+async def sync_index():
+    """Apply business writes from other workers and importers to this worker's index."""
+    if _index is not None:
+        await asyncio.to_thread(_sync_built_index)
+
+# Runs in every worker, unlike the upstream refresh jobs, as each has its own index
+sync_scheduler = RefreshScheduler(interval=SYNC_INTERVAL)
+sync_scheduler.add_job("businesses", sync_index)
+
+def index_business(business: Business):
+    """Insert or update a business in the index if it has been built."""
+    if _index is None:
+        return
+    entry = entry_from_business(business)
+    if entry:
+        _index.upsert(entry)
+    else:
+        _index.remove(business_place_id(business))
@@ -0,0 +1,56 @@
+import os
+from typing import Callable
+
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.sql import Select
+
+from .database import SessionLocal
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 500))
+
+def wants_stream(request: Request, stream: bool = False) -> bool:
+    """Whether the client asked for NDJSON via ?stream=1 or the Accept header."""
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def _dumps(value) -> bytes:
+    if isinstance(value, BaseModel):
+        return value.model_dump_json().encode()
+    return orjson.dumps(value)
+
+def iter_ndjson(
+    statement: Select,
+    serialize: Callable,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+):
+    """
+    Yield the rows of a select as NDJSON, one chunk of lines at a time.
+
+    The statement runs on its own session with a server-side cursor, since
+    the request's session is closed while the body is still being sent.
+    Only one chunk of rows is held in memory at once. Selects of a single
+    entity yield the objects themselves, others yield rows.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=chunk_size))
+        rows = result.scalars() if len(result.keys()) == 1 else result
+        lines = []
+        for row in rows:
+            lines.append(_dumps(serialize(row)))
+            if len(lines) >= chunk_size:
+                yield b"\n".join(lines) + b"\n"
+                lines.clear()
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+    finally:
+        db.close()
+
+def ndjson_response(statement: Select, serialize: Callable, **headers) -> StreamingResponse:
+    """Stream a select's rows as a chunked application/x-ndjson response."""
+    return StreamingResponse(
+        iter_ndjson(statement, serialize), media_type=NDJSON_MEDIA_TYPE, headers=headers or None
+    )
@@ -0,0 +1,25 @@
+"""
+Fixtures for the backend tests.
+
+The app reads its configuration when backend modules are first imported, so
+the session fixture points DATABASE_URL at a scratch SQLite file and turns
+off the upstream refresh jobs before importing anything from backend.
+"""
+import pytest
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}")
+        # Tests run offline; keep the upstream refresh jobs from starting
+        mp.setenv("REFRESH_ENABLED", "0")
+        from backend.main import app
+
+        yield app
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,107 @@
+"""
+Query-plan regression tests for the router queries.
+
+Each hot endpoint runs against a small seeded database; every SELECT it
+issues is captured. A route must stay within its query budget (so per-row
+photo or business loading can't come back) and EXPLAIN QUERY PLAN must not
+show a full table scan of a table that should be reached through an index.
+"""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+# (description, method, path, params, max SELECTs, tables that must not be fully scanned)
+# Budgets include the table_versions lookup behind the ETag
+CHECKS = [
+    ("list businesses", "GET", "/businesses/", {}, 3, {"business_photos"}),
+    ("businesses by category", "GET", "/businesses/", {"category": "food"}, 3, {"businesses", "business_photos"}),
+    ("businesses by category, keyset", "GET", "/businesses/", {"category": "food", "cursor": ""}, 3, {"businesses", "business_photos"}),
+    ("businesses by rating", "GET", "/businesses/", {"sort_by": "rating"}, 3, {"business_photos"}),
+    ("businesses above a rating", "GET", "/businesses/", {"min_rating": 4}, 3, {"business_photos"}),
+    ("business search", "GET", "/businesses/", {"search": "cafe"}, 3, {"businesses", "business_photos"}),
+    ("business detail", "GET", "/businesses/1", {}, 3, {"businesses", "business_photos"}),
+    ("upcoming events", "GET", "/events/", {}, 2, {"events", "businesses"}),
+    ("upcoming events, keyset", "GET", "/events/", {"cursor": ""}, 2, {"events", "businesses"}),
+    ("events this week", "GET", "/events/", {"mode": "week"}, 2, {"events", "businesses", "event_calendar"}),
+    ("events on now nearby", "GET", "/events/", {"mode": "now", "lat": 11.01, "lon": 76.95}, 2, {"events", "event_calendar"}),
+    ("event calendar, month", "GET", "/events/calendar", {"view": "month"}, 2, {"events", "businesses", "event_calendar"}),
+    ("event detail", "GET", "/events/1", {}, 3, {"events", "businesses"}),
+    ("update business", "PUT", "/businesses/1", {"name": "Cafe One"}, 3, {"users", "businesses"}),
+]
+
+@pytest.fixture(scope="module")
+def seeded(app):
+    from backend.database import SessionLocal
+    from backend.models import Business, BusinessPhoto, Event, Review, User
+
+    db = SessionLocal()
+    try:
+        owner = User(username="owner", email="owner@example.com", hashed_password="x")
+        db.add(owner)
+        now = datetime.utcnow()
+        for i in range(50):
+            business = Business(
+                name=f"Cafe {i}", description="Coffee and snacks", category="food" if i % 2 else "services",
+                latitude=11.0 + i * 0.001, longitude=76.95, owner=owner,
+            )
+            business.photos = [BusinessPhoto(url=f"/photos/{i}.jpg", is_main=True)]
+            db.add(business)
+            db.add(Review(business=business, user=owner, rating=4))
+            db.add(Event(
+                title=f"Event {i}", business=business,
+                start_date=now + timedelta(days=i + 1), end_date=now + timedelta(days=i + 2),
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+@pytest.fixture
+def captured(app):
+    """SELECT statements issued during the test, as (statement, parameters)."""
+    from backend.database import async_engine, engine
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    # Reads run on the async engine when ASYNC_DB_READS=1, otherwise on the sync one
+    targets = (engine, async_engine.sync_engine)
+    for target in targets:
+        event.listen(target, "before_cursor_execute", capture)
+    yield statements
+    for target in targets:
+        event.remove(target, "before_cursor_execute", capture)
+
+@pytest.fixture
+def auth_headers(seeded):
+    from backend.auth import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'owner'})}"}
+
+def full_scans(statement, parameters):
+    """Return the tables a statement reads with a full scan."""
+    from backend.database import engine
+
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return {match.group(1) for row in plan if (match := FULL_SCAN.match(row[-1]))}
+
+@pytest.mark.parametrize(
+    "method, path, params, max_queries, forbidden",
+    [pytest.param(*check[1:], id=check[0]) for check in CHECKS],
+)
+def test_query_plan(client, seeded, auth_headers, captured, method, path, params, max_queries, forbidden):
+    response = client.request(method, path, params=params, headers=auth_headers)
+    assert response.status_code < 400, response.text
+    assert len(captured) <= max_queries, f"{len(captured)} queries, expected at most {max_queries}"
+
+    scanned = set()
+    for statement, parameters in list(captured):
+        scanned |= full_scans(statement, parameters) & forbidden
+    assert not scanned, f"full scan of {', '.join(sorted(scanned))}"